@@ -0,0 +1,146 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import Avg, Count, F, Q, Sum, Window
+from django.db.models.functions import Floor, Rank
+
+from .models import DailyFollowUp, Student
+
+
+def _rate(present, total):
+    return round(present / total, 4) if total else None
+
+
+def _round(value):
+    return None if value is None else round(float(value), 2)
+
+
+def _followups(grade_id, date_from, date_to):
+    queryset = DailyFollowUp.objects.filter(date__gte=date_from, date__lte=date_to)
+    return queryset.filter(student__grade_id=grade_id) if grade_id else queryset
+
+
+def _absence_streaks(grade_id, date_from, date_to):
+    """
+    Longest run of consecutive recorded days absent, per student (gaps and islands:
+    the difference of two row numbers is constant within a run).
+    """
+    followups = DailyFollowUp._meta.db_table
+    students = Student._meta.db_table
+    grade_filter = "AND s.grade_id = %s" if grade_id else ""
+    params = [date_from, date_to] + ([grade_id] if grade_id else [])
+    sql = f"""
+        WITH marked AS (
+            SELECT f.student_id, f.is_absent,
+                   ROW_NUMBER() OVER (PARTITION BY f.student_id ORDER BY f.date)
+                 - ROW_NUMBER() OVER (PARTITION BY f.student_id, f.is_absent ORDER BY f.date) AS run
+            FROM {followups} f
+            JOIN {students} s ON s.id = f.student_id
+            WHERE f.date >= %s AND f.date <= %s {grade_filter}
+        ), runs AS (
+            SELECT student_id, COUNT(*) AS length
+            FROM marked
+            WHERE is_absent
+            GROUP BY student_id, run
+        )
+        SELECT student_id, MAX(length) FROM runs GROUP BY student_id
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return dict(cursor.fetchall())
+
+
+def grade_analytics(grade_id, date_from, date_to, bucket=5):
+    """
+    Attendance and degree statistics per student, per grade and per day, computed
+    with conditional aggregates and window functions in four queries.
+    """
+    followups = _followups(grade_id, date_from, date_to)
+    graded = Q(degree__isnull=False)
+
+    per_student = list(
+        followups.values("student_id", "student__name", "student__grade_id", "student__grade__level")
+        .annotate(
+            days=Count("id"),
+            absences=Count("id", filter=Q(is_absent=True)),
+            degree_sum=Sum("degree", filter=graded),
+            degree_count=Count("id", filter=graded),
+            average_degree=Avg("degree", filter=graded),
+            rank=Window(Rank(), order_by=F("average_degree").desc(nulls_last=True)),
+        )
+        .order_by("rank", "student_id")
+    )
+    streaks = _absence_streaks(grade_id, date_from, date_to)
+
+    daily = followups.values("date").annotate(
+        recorded=Count("id"),
+        absent=Count("id", filter=Q(is_absent=True)),
+        average_degree=Avg("degree", filter=graded),
+    ).order_by("date")
+
+    width = Decimal(bucket)
+    distribution = (
+        followups.filter(graded)
+        .annotate(bucket=Floor(F("degree") / width) * width)
+        .values("bucket")
+        .annotate(count=Count("id"))
+        .order_by("bucket")
+    )
+
+    grades = {}
+    for row in per_student:
+        grade = grades.setdefault(row["student__grade_id"], {
+            "grade_id": row["student__grade_id"],
+            "level": row["student__grade__level"],
+            "students": 0, "days": 0, "absences": 0, "degree_sum": Decimal(0), "degree_count": 0,
+        })
+        grade["students"] += 1
+        grade["days"] += row["days"]
+        grade["absences"] += row["absences"]
+        grade["degree_sum"] += row["degree_sum"] or 0
+        grade["degree_count"] += row["degree_count"]
+
+    return {
+        "from": date_from,
+        "to": date_to,
+        "grades": [
+            {
+                "grade_id": grade["grade_id"],
+                "level": grade["level"],
+                "students": grade["students"],
+                "days": grade["days"],
+                "absences": grade["absences"],
+                "attendance_rate": _rate(grade["days"] - grade["absences"], grade["days"]),
+                "average_degree": _round(grade["degree_sum"] / grade["degree_count"]) if grade["degree_count"] else None,
+            }
+            for grade in grades.values()
+        ],
+        "students": [
+            {
+                "student_id": row["student_id"],
+                "name": row["student__name"],
+                "grade_id": row["student__grade_id"],
+                "days": row["days"],
+                "absences": row["absences"],
+                "attendance_rate": _rate(row["days"] - row["absences"], row["days"]),
+                "average_degree": _round(row["average_degree"]),
+                "rank": row["rank"],
+                "longest_absence_streak": streaks.get(row["student_id"], 0),
+            }
+            for row in per_student
+        ],
+        "daily": [
+            {
+                "date": row["date"],
+                "recorded": row["recorded"],
+                "absent": row["absent"],
+                "attendance_rate": _rate(row["recorded"] - row["absent"], row["recorded"]),
+                "average_degree": _round(row["average_degree"]),
+            }
+            for row in daily
+        ],
+        "degree_distribution": [
+            {"from": _round(row["bucket"]), "to": _round(row["bucket"] + width), "count": row["count"]}
+            for row in distribution
+        ],
+    }
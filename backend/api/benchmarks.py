@@ -0,0 +1,430 @@
+import json
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.db.backends.signals import connection_created
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import URLPattern
+from rest_framework.renderers import JSONRenderer
+
+from . import urls
+from .deletion import delete_students
+from .models import DailyFollowUp, Job, JobOutput, MonthlyPayment, Quiz, Student
+from .renderers import FastJSONRenderer
+from .seeding import seed
+from .serializers import DailyFollowUpSerializer, DailyFollowUpValuesSerializer, QuizSerializer, QuizValuesSerializer
+
+
+@dataclass
+class EndpointCase:
+    """One request against a route of ``api/urls.py``; ``build(ctx)`` returns ``(path, body)``."""
+    route: str
+    method: str
+    build: Callable
+    # known to issue more queries as the grade grows; reported but not failed
+    scales: bool = False
+
+
+ENDPOINT_CASES = [
+    EndpointCase("grades/", "get", lambda ctx: ("grades/", None)),
+    EndpointCase("grades/<int:pk>/", "get", lambda ctx: (f"grades/{ctx['grade'].id}/", None)),
+    EndpointCase("students/", "get", lambda ctx: ("students/", None)),
+    EndpointCase("students/import/", "post", lambda ctx: ("students/import/?dry_run=1", [
+        {"name": f"import {index}", "grade": ctx["grade"].id, "contact_phone": "01000000000"}
+        for index in range(ctx["size"])
+    ])),
+    EndpointCase("students/all/delete/", "delete", lambda ctx: ("students/all/delete/", {"ids": ctx["student_ids"]})),
+    EndpointCase("students/<int:pk>/", "get", lambda ctx: (f"students/{ctx['student'].id}/", None)),
+    EndpointCase("students/<int:pk>/all/", "get", lambda ctx: (f"students/{ctx['student'].id}/all/", None)),
+    EndpointCase("students/search/<str:value>", "get", lambda ctx: ("students/search/bench?limit=100", None)),
+    EndpointCase("students/grades/<str:id>", "get", lambda ctx: (f"students/grades/{ctx['grade'].id}", None)),
+    EndpointCase("daily-followups/", "get", lambda ctx: (f"daily-followups/?grade={ctx['grade'].id}&date={ctx['date']}", None)),
+    EndpointCase("daily-followups/", "patch", lambda ctx: ("daily-followups/", [
+        {"id": pk, "is_absent": True} for pk in ctx["followup_ids"]
+    ])),
+    EndpointCase("months/", "get", lambda ctx: ("months/", None)),
+    EndpointCase("payments/", "get", lambda ctx: (f"payments/?grade={ctx['grade'].id}", None)),
+    EndpointCase("payments/", "patch", lambda ctx: ("payments/", [
+        {"payment_id": pk, "is_paid": True} for pk in ctx["payment_ids"]
+    ])),
+    EndpointCase("quizzes/", "get", lambda ctx: (f"quizzes/?grade={ctx['grade'].id}", None)),
+    EndpointCase("quizzes/", "patch", lambda ctx: ("quizzes/", [
+        {"id": pk, "notes": "bench"} for pk in ctx["quiz_ids"]
+    ]), scales=True),
+    EndpointCase("async/daily-followups/", "get", lambda ctx: (f"async/daily-followups/?grade={ctx['grade'].id}&date={ctx['date']}", None)),
+    EndpointCase("async/payments/", "get", lambda ctx: (f"async/payments/?grade={ctx['grade'].id}", None)),
+    EndpointCase("async/quizzes/", "get", lambda ctx: (f"async/quizzes/?grade={ctx['grade'].id}", None)),
+    EndpointCase("async/students/search/<str:value>", "get", lambda ctx: ("async/students/search/bench?limit=100", None)),
+    EndpointCase("analytics/", "get", lambda ctx: (f"analytics/?grade={ctx['grade'].id}", None)),
+    EndpointCase("request-stats/", "get", lambda ctx: ("request-stats/", None)),
+    EndpointCase("grid-cache/stats/", "get", lambda ctx: ("grid-cache/stats/", None)),
+    EndpointCase("export/students/", "get", lambda ctx: (f"export/students/?grade={ctx['grade'].id}", None)),
+    EndpointCase("export/daily-followups/", "get", lambda ctx: (f"export/daily-followups/?grade={ctx['grade'].id}", None)),
+    EndpointCase("export/payments/", "get", lambda ctx: (f"export/payments/?grade={ctx['grade'].id}", None)),
+    EndpointCase("export/quizzes/", "get", lambda ctx: (f"export/quizzes/?grade={ctx['grade'].id}", None)),
+    EndpointCase("jobs/", "get", lambda ctx: ("jobs/", None)),
+    EndpointCase("jobs/<int:pk>/", "get", lambda ctx: (f"jobs/{ctx['job'].id}/", None)),
+    EndpointCase("jobs/<int:pk>/download/", "get", lambda ctx: (f"jobs/{ctx['job'].id}/download/", None)),
+    EndpointCase("delete-all/", "delete", lambda ctx: ("delete-all/", None), scales=True),
+]
+
+
+class _Rollback(Exception):
+    pass
+
+
+def uncovered_routes(cases=ENDPOINT_CASES):
+    routes = {str(pattern.pattern) for pattern in urls.urlpatterns if isinstance(pattern, URLPattern)}
+    return sorted(routes - {case.route for case in cases})
+
+
+def _context(size):
+    grade = seed(grades=2, students_per_grade=size, months=4, days=5, prefix="bench")[0]
+    students = Student.objects.filter(grade=grade).order_by("id")
+    day = DailyFollowUp.objects.filter(student__grade=grade).order_by("-date").values_list("date", flat=True).first()
+    job = Job.objects.create(kind="export", status=Job.DONE, result={"file": f"bench-{size}.csv", "rows": 0})
+    JobOutput.objects.create(job=job, seq=0, data="id,name\r\n")
+    return {
+        "job": job,
+        "size": size,
+        "grade": grade,
+        "student": students.first(),
+        "date": day.isoformat(),
+        "student_ids": list(students.values_list("id", flat=True)),
+        "followup_ids": list(DailyFollowUp.objects.filter(student__grade=grade, date=day).values_list("id", flat=True)),
+        "payment_ids": list(MonthlyPayment.objects.filter(student__grade=grade).values_list("id", flat=True)),
+        "quiz_ids": list(Quiz.objects.filter(student__grade=grade).values_list("id", flat=True)),
+    }
+
+
+def _measure(client, case, ctx):
+    path, body = case.build(ctx)
+    request = getattr(client, case.method)
+    with CaptureQueriesContext(connection) as queries:
+        started = time.perf_counter()
+        response = request(f"/api/{path}", body, content_type="application/json") if body is not None else request(f"/api/{path}")
+        content = b"".join(response.streaming_content) if response.streaming else response.content
+        elapsed = time.perf_counter() - started
+    return {
+        "status": response.status_code,
+        "wall_ms": round(elapsed * 1000, 2),
+        "queries": len(queries),
+        "bytes": len(content),
+    }
+
+
+def run_endpoint_benchmark(sizes, cases=ENDPOINT_CASES):
+    """
+    Seed a dataset for every size (students per grade) and run each case against it.
+    Every case runs in its own rolled-back transaction, so mutations don't leak into
+    the next one and nothing is left behind. Returns ``(report, failures)``.
+    """
+    client = Client()
+    report = {"sizes": list(sizes), "vendor": connection.vendor, "endpoints": []}
+    results = {index: [] for index in range(len(cases))}
+
+    with override_settings(GRID_CACHE_ENABLED=False, REQUEST_STATS_ENABLED=True, ALLOWED_HOSTS=["testserver"]):
+        for size in sizes:
+            try:
+                with transaction.atomic():
+                    ctx = _context(size)
+                    for index, case in enumerate(cases):
+                        try:
+                            with transaction.atomic():
+                                results[index].append({"size": size, **_measure(client, case, ctx)})
+                                raise _Rollback
+                        except _Rollback:
+                            pass
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+    failures = []
+    for index, case in enumerate(cases):
+        runs = results[index]
+        counts = [run["queries"] for run in runs]
+        constant = len(set(counts)) == 1
+        report["endpoints"].append({
+            "route": case.route,
+            "method": case.method.upper(),
+            "expected_constant_queries": not case.scales,
+            "constant_queries": constant,
+            "runs": runs,
+        })
+        if not case.scales and not constant:
+            failures.append(f"{case.method.upper()} {case.route}: queries {counts} for sizes {list(sizes)}")
+        failures += [
+            f"{case.method.upper()} {case.route}: HTTP {run['status']} at size {run['size']}"
+            for run in runs if run["status"] >= 400
+        ]
+    return report, failures
+
+
+DELETE_STRATEGIES = {
+    "collector": lambda students: students.delete()[1].get(Student._meta.label, 0),
+    "set_based": delete_students,
+}
+
+
+def run_delete_benchmark(students, days_list, months=10):
+    """
+    Delete one grade of ``students`` students whose history is ``days`` follow-ups
+    each (plus ``months`` payments and quizzes), once with Django's collector
+    and once with :func:`api.deletion.delete_students`, for every ``days`` in
+    ``days_list``. Each run is rolled back. Reports wall time, SQL queries and
+    peak Python memory.
+    """
+    report = {"students": students, "months": months, "vendor": connection.vendor, "runs": []}
+    for days in days_list:
+        for name, strategy in DELETE_STRATEGIES.items():
+            try:
+                with transaction.atomic():
+                    grade = seed(grades=1, students_per_grade=students, months=months, days=days, prefix="bench")[0]
+                    queryset = Student.objects.filter(grade=grade)
+                    queries = []
+                    tracemalloc.start()
+                    # count without keeping SQL around: the collector can exceed the query log's cap
+                    with connection.execute_wrapper(lambda execute, *args: queries.append(None) or execute(*args)):
+                        started = time.perf_counter()
+                        deleted = strategy(queryset)
+                        elapsed = time.perf_counter() - started
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    report["runs"].append({
+                        "strategy": name,
+                        "days": days,
+                        "history_rows": students * (days + 2 * months),
+                        "deleted_students": deleted,
+                        "wall_ms": round(elapsed * 1000, 2),
+                        "queries": len(queries),
+                        "peak_kib": round(peak / 1024, 1),
+                    })
+                    raise _Rollback
+            except _Rollback:
+                pass
+    return report
+
+
+def load_test(base_url, paths, clients, requests_per_client, timeout=30):
+    """
+    Hit ``base_url + path`` for every path from ``clients`` concurrent threads,
+    ``requests_per_client`` times each, cycling through the paths. Returns
+    throughput and latency percentiles.
+    """
+    def client(index):
+        latencies, errors = [], 0
+        for number in range(requests_per_client):
+            url = base_url + paths[(index + number) % len(paths)]
+            started = time.perf_counter()
+            try:
+                with urllib.request.urlopen(url, timeout=timeout) as response:
+                    response.read()
+            except (urllib.error.URLError, OSError):
+                errors += 1
+                continue
+            latencies.append((time.perf_counter() - started) * 1000)
+        return latencies, errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(client, range(clients)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for result, _ in results for latency in result)
+
+    def percentile(p):
+        return round(latencies[min(len(latencies) - 1, int(len(latencies) * p))], 1) if latencies else None
+
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "errors": sum(errors for _, errors in results),
+        "seconds": round(elapsed, 2),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else None,
+        "p50_ms": percentile(0.5),
+        "p95_ms": percentile(0.95),
+    }
+
+
+def run_connection_benchmark(alias, threads, requests_per_thread, sql="SELECT COUNT(*) FROM api_student"):
+    """
+    Simulate ``threads`` workers serving ``requests_per_thread`` requests each on
+    database ``alias``: every request runs ``sql`` between the connection
+    bookkeeping Django does on request_started/request_finished, so connection
+    setup, TLS, pooling and health checks are all part of the measured time.
+    """
+    opened = []
+
+    def count(sender, connection, **kwargs):
+        if connection.alias == alias:
+            opened.append(None)
+
+    def worker(_):
+        conn = connections[alias]
+        latencies = []
+        try:
+            for _ in range(requests_per_thread):
+                started = time.perf_counter()
+                conn.close_if_unusable_or_obsolete()
+                with conn.cursor() as cursor:
+                    cursor.execute(sql)
+                    cursor.fetchall()
+                conn.close_if_unusable_or_obsolete()
+                latencies.append((time.perf_counter() - started) * 1000)
+        finally:
+            conn.close()
+        return latencies
+
+    connection_created.connect(count, weak=False)
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            latencies = sorted(latency for result in pool.map(worker, range(threads)) for latency in result)
+        elapsed = time.perf_counter() - started
+    finally:
+        connection_created.disconnect(count)
+
+    return {
+        "threads": threads,
+        "requests": len(latencies),
+        "seconds": round(elapsed, 2),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2], 2),
+        "p95_ms": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 2),
+        # connection_created fires per checkout under a pool, so this is checkouts there
+        "connects": len(opened),
+    }
+
+
+# Run in a fresh interpreter: load the WSGI app the way core/wsgi.py does, then
+# serve two requests to PATH without going through a server.
+_STARTUP_SCRIPT = """
+import io, json, os, sys, time
+started = time.perf_counter()
+from django.core.wsgi import get_wsgi_application
+application = get_wsgi_application()
+loaded = time.perf_counter()
+
+def request():
+    path, _, query = os.environ["BENCH_PATH"].partition("?")
+    environ = {
+        "REQUEST_METHOD": "GET", "PATH_INFO": path, "QUERY_STRING": query, "SCRIPT_NAME": "",
+        "SERVER_NAME": "127.0.0.1", "SERVER_PORT": "80", "HTTP_HOST": "127.0.0.1",
+        "wsgi.input": io.BytesIO(), "wsgi.errors": sys.stderr, "wsgi.url_scheme": "http",
+    }
+    statuses = []
+    body = b"".join(application(environ, lambda status, headers, exc_info=None: statuses.append(status)))
+    return int(statuses[0].split()[0]), len(body)
+
+status, size = request()
+first = time.perf_counter()
+request()
+second = time.perf_counter()
+print(json.dumps({
+    "import_ms": (loaded - started) * 1000, "first_request_ms": (first - loaded) * 1000,
+    "warm_request_ms": (second - first) * 1000, "status": status, "bytes": size, "modules": len(sys.modules),
+}))
+"""
+
+
+def measure_startup(env, path="/api/grades/", runs=5):
+    """
+    Cold-start the app ``runs`` times in new interpreters with ``env`` and
+    return the medians of: loading the WSGI app, its first request to
+    ``path`` (lazy imports, URL resolution, opening the database connection),
+    a warm request, and the whole process, plus the number of loaded modules.
+    """
+    env = {
+        **env,
+        "BENCH_PATH": path,
+        "ALLOWED_HOSTS_DEPLOY": ",".join(filter(None, [env.get("ALLOWED_HOSTS_DEPLOY"), "127.0.0.1"])),
+    }
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        done = subprocess.run(
+            [sys.executable, "-c", _STARTUP_SCRIPT], cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        elapsed = (time.perf_counter() - started) * 1000
+        if done.returncode:
+            raise RuntimeError(done.stderr.strip().splitlines()[-1] if done.stderr.strip() else "startup failed")
+        samples.append({**json.loads(done.stdout.strip().splitlines()[-1]), "process_ms": elapsed})
+
+    result = {
+        key: round(statistics.median(sample[key] for sample in samples), 1)
+        for key in ("import_ms", "first_request_ms", "warm_request_ms", "process_ms")
+    }
+    return {**result, "status": samples[-1]["status"], "modules": samples[-1]["modules"], "runs": runs}
+
+
+# grid listing -> (queryset, current ModelSerializer, values_list() fast path)
+SERIALIZER_CASES = {
+    "followups": (
+        lambda grade: DailyFollowUp.objects.filter(student__grade=grade).select_related("student")
+        .order_by("student_id", "date"),
+        DailyFollowUpSerializer,
+        DailyFollowUpValuesSerializer,
+    ),
+    "quizzes": (
+        lambda grade: Quiz.objects.filter(student__grade=grade).select_related("student", "month")
+        .order_by("student_id", "month__order", "month_id"),
+        QuizSerializer,
+        QuizValuesSerializer,
+    ),
+}
+
+
+def _best(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def run_serializer_benchmark(students, days=20, months=10, repeat=3):
+    """
+    Rows/sec of the grid listings through their ModelSerializer and through
+    the values_list() fast path, each rendered with DRF's JSONRenderer and
+    with FastJSONRenderer, on one seeded grade (rolled back afterwards).
+    ``serialize`` includes the query; the best of ``repeat`` runs is kept.
+    """
+    report = {"students": students, "vendor": connection.vendor, "runs": []}
+    try:
+        with transaction.atomic():
+            grade = seed(grades=1, students_per_grade=students, months=months, days=days, prefix="bench")[0]
+            for name, (queryset, model_serializer, values_serializer) in SERIALIZER_CASES.items():
+                paths = {
+                    "serializer": lambda: model_serializer(queryset(grade), many=True).data,
+                    "values": lambda: values_serializer().rows(queryset(grade)),
+                }
+                for path, serialize in paths.items():
+                    serialize_s, data = _best(serialize, repeat)
+                    for renderer in (JSONRenderer(), FastJSONRenderer()):
+                        render_s, content = _best(lambda: renderer.render(data), repeat)
+                        report["runs"].append({
+                            "listing": name,
+                            "path": path,
+                            "renderer": type(renderer).__name__,
+                            "rows": len(data),
+                            "bytes": len(content),
+                            "serialize_ms": round(serialize_s * 1000, 2),
+                            "render_ms": round(render_s * 1000, 2),
+                            "rows_per_sec": round(len(data) / (serialize_s + render_s)),
+                        })
+            raise _Rollback
+    except _Rollback:
+        pass
+    return report
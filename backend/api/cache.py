@@ -0,0 +1,118 @@
+import asyncio
+
+from django.conf import settings
+from django.core.cache import caches
+
+# Grid responses are cached under keys that embed a per-grade version plus a
+# school-wide version (bumped by PaymentMonth changes). Writes bump the version
+# instead of deleting keys, so stale entries simply age out.
+
+ALL_GRADES = "all"
+
+
+def _cache():
+    return caches[getattr(settings, "GRID_CACHE_ALIAS", "default")]
+
+
+def _timeout():
+    return getattr(settings, "GRID_CACHE_TIMEOUT", 300)
+
+
+def _version_key(grade_id):
+    return f"grid:version:{grade_id}"
+
+
+def _count(name):
+    cache = _cache()
+    key = f"grid:stats:{name}"
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+async def _acount(name):
+    cache = _cache()
+    key = f"grid:stats:{name}"
+    await cache.aadd(key, 0, timeout=None)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aset(key, 1, timeout=None)
+
+
+def grade_version(grade_id):
+    return _cache().get(_version_key(grade_id), 1)
+
+
+async def agrade_version(grade_id):
+    return await _cache().aget(_version_key(grade_id), 1)
+
+
+def _grid_key(endpoint, grade_id, variant, school_version, version):
+    return f"grid:{endpoint}:{grade_id}:{variant}:{school_version}:{version}"
+
+
+def bump_grades(*grade_ids):
+    cache = _cache()
+    for grade_id in {str(grade_id) for grade_id in grade_ids if grade_id is not None}:
+        key = _version_key(grade_id)
+        if cache.add(key, 2, timeout=None):
+            continue
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 2, timeout=None)
+
+
+def bump_all_grades():
+    bump_grades(ALL_GRADES)
+
+
+def cached_grid(endpoint, grade_id, variant, build):
+    """
+    Return the serialized grid for ``(endpoint, grade_id, variant)``, calling
+    ``build()`` and storing its result on a miss.
+    """
+    if not getattr(settings, "GRID_CACHE_ENABLED", True):
+        return build()
+
+    cache = _cache()
+    key = _grid_key(endpoint, grade_id, variant, grade_version(ALL_GRADES), grade_version(grade_id))
+    data = cache.get(key)
+    if data is not None:
+        _count("hits")
+        return data
+
+    _count("misses")
+    data = list(build())
+    cache.set(key, data, timeout=_timeout())
+    return data
+
+
+async def acached_grid(endpoint, grade_id, variant, build):
+    """``cached_grid`` for async views: same keys, ``build`` is a coroutine function."""
+    if not getattr(settings, "GRID_CACHE_ENABLED", True):
+        return await build()
+
+    cache = _cache()
+    versions = await asyncio.gather(agrade_version(ALL_GRADES), agrade_version(grade_id))
+    key = _grid_key(endpoint, grade_id, variant, *versions)
+    data = await cache.aget(key)
+    if data is not None:
+        await _acount("hits")
+        return data
+
+    await _acount("misses")
+    data = list(await build())
+    await cache.aset(key, data, timeout=_timeout())
+    return data
+
+
+def stats():
+    cache = _cache()
+    return {
+        "hits": cache.get("grid:stats:hits", 0),
+        "misses": cache.get("grid:stats:misses", 0),
+    }
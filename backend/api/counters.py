@@ -0,0 +1,76 @@
+from django.db.models import Case, Count, F, IntegerField, OuterRef, Subquery, Value, When
+from django.db.models.functions import Coalesce
+
+from .models import DailyFollowUp, MonthlyPayment, Student
+
+# Student.absence_count, unpaid_months and latest_degree(_date) are denormalized
+# from DailyFollowUp and MonthlyPayment. Single saves/deletes keep them in step
+# through signals (api/signals.py); bulk write paths call these helpers directly.
+
+REBUILD_BATCH_SIZE = 500
+
+
+def per_student(queryset, aggregate):
+    """Correlated subquery computing ``aggregate`` over ``queryset`` rows of the outer student."""
+    return Subquery(
+        queryset.filter(student=OuterRef("pk")).order_by().values("student").annotate(value=aggregate).values("value")
+    )
+
+
+def apply_deltas(field, deltas):
+    """Add ``deltas[student_id]`` to ``field`` for every student in one atomic UPDATE."""
+    deltas = {student_id: delta for student_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    change = Case(
+        *[When(pk=student_id, then=Value(delta)) for student_id, delta in deltas.items()],
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    Student.objects.filter(pk__in=deltas).update(**{field: F(field) + change})
+
+
+def _latest_degree():
+    return DailyFollowUp.objects.filter(student=OuterRef("pk"), degree__isnull=False).order_by("-date", "-id")
+
+
+def refresh_latest_degree(students):
+    latest = _latest_degree()
+    Student.objects.filter(pk__in=students).update(
+        latest_degree=Subquery(latest.values("degree")[:1]),
+        latest_degree_date=Subquery(latest.values("date")[:1]),
+    )
+
+
+def refresh_unpaid_months(students):
+    Student.objects.filter(pk__in=students).update(
+        unpaid_months=Coalesce(per_student(MonthlyPayment.objects.filter(is_paid=False), Count("id")), 0),
+    )
+
+
+def rebuild_counters(students):
+    """Recompute every counter of ``students`` (ids or a queryset) from the source tables."""
+    latest = _latest_degree()
+    return Student.objects.filter(pk__in=students).update(
+        absence_count=Coalesce(per_student(DailyFollowUp.objects.filter(is_absent=True), Count("id")), 0),
+        unpaid_months=Coalesce(per_student(MonthlyPayment.objects.filter(is_paid=False), Count("id")), 0),
+        latest_degree=Subquery(latest.values("degree")[:1]),
+        latest_degree_date=Subquery(latest.values("date")[:1]),
+    )
+
+
+def rebuild_all_counters(batch_size=REBUILD_BATCH_SIZE, progress=None):
+    """Rebuild counters for every student in primary-key batches and return how many were processed."""
+    done = 0
+    last_id = 0
+    while True:
+        batch = list(
+            Student.objects.filter(pk__gt=last_id).order_by("pk").values_list("pk", flat=True)[:batch_size]
+        )
+        if not batch:
+            return done
+        rebuild_counters(batch)
+        done += len(batch)
+        last_id = batch[-1]
+        if progress:
+            progress(done)
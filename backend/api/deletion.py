@@ -0,0 +1,100 @@
+"""
+Set-based student and grade deletion.
+
+``Student.objects.filter(...).delete()`` makes Django's collector select every
+follow-up, payment and quiz of those students into memory (and fire their
+per-row signals) before deleting them. Here students are processed in chunks
+of ``DELETE_BATCH_SIZE`` and each chunk costs a fixed number of statements:
+tombstones for the grid rows via ``INSERT ... SELECT``, one ``DELETE`` per
+child table, then the students themselves. Nothing but student ids is read
+into Python, so memory and round trips follow the number of students, not
+their history.
+"""
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .cache import bump_grades
+from .models import DailyFollowUp, Grade, MonthlyPayment, Quiz, Student, Tombstone
+
+DELETE_BATCH_SIZE = 500
+STUDENT_CHILDREN = [DailyFollowUp, MonthlyPayment, Quiz]
+MONTH_CHILDREN = [MonthlyPayment, Quiz]
+
+
+def _table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def _insert_tombstones(cursor, model, column, ids, now):
+    placeholders = ", ".join(["%s"] * len(ids))
+    cursor.execute(
+        f"INSERT INTO {_table(Tombstone)} (model, object_id, grade_id, deleted_at) "
+        f"SELECT %s, child.id, student.grade_id, %s FROM {_table(model)} child "
+        f"JOIN {_table(Student)} student ON student.id = child.student_id "
+        f"WHERE child.{column} IN ({placeholders})",
+        [model._meta.model_name, now, *ids],
+    )
+
+
+def _tombstone_rows(models, column, ids, batch_size):
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    with connection.cursor() as cursor:
+        for start in range(0, len(ids), batch_size):
+            for model in models:
+                _insert_tombstones(cursor, model, column, ids[start:start + batch_size], now)
+
+
+def tombstone_student_rows(student_ids, batch_size=DELETE_BATCH_SIZE):
+    """
+    Tombstone the follow-ups, payments and quizzes of ``student_ids`` before
+    they are deleted some other way (e.g. by Django's collector), one
+    ``INSERT ... SELECT`` per table and ``batch_size`` students.
+    """
+    _tombstone_rows(STUDENT_CHILDREN, "student_id", student_ids, batch_size)
+
+
+def tombstone_month_rows(month_ids, batch_size=DELETE_BATCH_SIZE):
+    """Like :func:`tombstone_student_rows`, for the payments and quizzes of deleted months."""
+    _tombstone_rows(MONTH_CHILDREN, "month_id", month_ids, batch_size)
+
+
+def _delete_chunk(cursor, student_ids, tombstones, now):
+    placeholders = ", ".join(["%s"] * len(student_ids))
+    for model in STUDENT_CHILDREN:
+        if tombstones:
+            _insert_tombstones(cursor, model, "student_id", student_ids, now)
+        cursor.execute(f"DELETE FROM {_table(model)} WHERE student_id IN ({placeholders})", student_ids)
+    cursor.execute(f"DELETE FROM {_table(Student)} WHERE id IN ({placeholders})", student_ids)
+    return cursor.rowcount
+
+
+def delete_students(queryset, batch_size=DELETE_BATCH_SIZE, tombstones=True):
+    """
+    Delete the students of ``queryset`` with their follow-ups, payments and
+    quizzes, ``batch_size`` students per round. Returns the number of students
+    deleted.
+    """
+    now = connection.ops.adapt_datetimefield_value(timezone.now())
+    deleted = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        grade_ids = set(queryset.values_list("grade_id", flat=True).distinct())
+        last_id = 0
+        while True:
+            chunk = list(queryset.filter(pk__gt=last_id).order_by("pk").values_list("pk", flat=True)[:batch_size])
+            if not chunk:
+                break
+            deleted += _delete_chunk(cursor, chunk, tombstones, now)
+            last_id = chunk[-1]
+            if len(chunk) < batch_size:
+                break
+    bump_grades(*grade_ids)
+    return deleted
+
+
+def delete_grades(queryset, batch_size=DELETE_BATCH_SIZE):
+    """Delete grades and everything under them; no tombstones, the grids themselves are gone."""
+    with transaction.atomic():
+        grade_ids = list(queryset.values_list("pk", flat=True))
+        delete_students(Student.objects.filter(grade_id__in=grade_ids), batch_size, tombstones=False)
+        deleted, _ = Grade.objects.filter(pk__in=grade_ids).delete()
+    return deleted
@@ -0,0 +1,74 @@
+from itertools import groupby
+
+from .models import DailyFollowUp, MonthlyPayment, PaymentMonth, Quiz, Student
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+def _by_grade(queryset, grade_id, field="student__grade_id"):
+    return queryset.filter(**{field: grade_id}) if grade_id else queryset
+
+
+def student_rows(grade_id=None):
+    header = ["id", "name", "grade", "contact_phone", "additional_phone", "initial_level", "notes", "created_at"]
+    rows = (
+        _by_grade(Student.objects.all(), grade_id, "grade_id")
+        .order_by("grade_id", "id")
+        .values_list("id", "name", "grade__level", "contact_phone", "additional_phone",
+                     "initial_level", "notes", "created_at")
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    return header, rows
+
+
+def followup_rows(grade_id=None, date_from=None, date_to=None):
+    header = ["date", "student_id", "name", "grade", "is_absent", "degree", "notes"]
+    queryset = _by_grade(DailyFollowUp.objects.all(), grade_id)
+    if date_from:
+        queryset = queryset.filter(date__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(date__lte=date_to)
+    rows = (
+        queryset.order_by("date", "student__grade_id", "student_id")
+        .values_list("date", "student_id", "student__name", "student__grade__level",
+                     "is_absent", "degree", "notes")
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+    return header, rows
+
+
+def _month_matrix(model, value_field, grade_id, render):
+    """
+    One line per student with a column per PaymentMonth, grouped on the fly from
+    a single ordered cursor so only one student is held in memory at a time.
+    """
+    months = list(PaymentMonth.objects.values_list("id", "name"))
+    header = ["student_id", "name", "grade", *[name for _, name in months]]
+    cells = (
+        _by_grade(model.objects.all(), grade_id)
+        .order_by("student__grade_id", "student_id", "month__order", "month_id")
+        .values_list("student_id", "student__name", "student__grade__level", "month_id", value_field)
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+    def rows():
+        for (student_id, name, grade), group in groupby(cells, key=lambda cell: cell[:3]):
+            values = {cell[3]: cell[4] for cell in group}
+            yield [student_id, name, grade, *[render(values.get(month_id)) for month_id, _ in months]]
+
+    return header, rows()
+
+
+def payment_rows(grade_id=None):
+    return _month_matrix(MonthlyPayment, "is_paid", grade_id, lambda paid: "" if paid is None else ("مدفوع" if paid else "غير مدفوع"))
+
+
+def quiz_rows(grade_id=None):
+    return _month_matrix(Quiz, "notes", grade_id, lambda notes: notes or "")
+
+
+def sheet_rows(sheet, grade_id=None, date_from=None, date_to=None):
+    """``(header, rows)`` for an export sheet by name: students, followups, payments or quizzes."""
+    if sheet == "followups":
+        return followup_rows(grade_id, date_from, date_to)
+    return {"students": student_rows, "payments": payment_rows, "quizzes": quiz_rows}[sheet](grade_id)
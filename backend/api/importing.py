@@ -0,0 +1,88 @@
+import csv
+import io
+import json
+
+from django.db import transaction
+
+from .models import Grade, Student
+from .serializers import StudentImportSerializer
+
+IMPORT_FIELDS = ['name', 'grade', 'contact_phone', 'additional_phone', 'initial_level', 'notes']
+IMPORT_BATCH_SIZE = 500
+
+
+class ImportFormatError(ValueError):
+    pass
+
+
+def read_rows(upload=None, data=None):
+    """
+    Return ``(first_line_number, rows)`` from an uploaded CSV/JSON file or an
+    already parsed JSON body (a list, or ``{"students": [...]}``).
+    """
+    if upload is not None:
+        try:
+            text = upload.read().decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise ImportFormatError("الملف لازم يكون UTF-8")
+        if upload.name.lower().endswith('.json'):
+            try:
+                data = json.loads(text)
+            except ValueError:
+                raise ImportFormatError("ملف JSON غير صالح")
+        else:
+            reader = csv.DictReader(io.StringIO(text))
+            return 2, [{key: value for key, value in row.items() if key in IMPORT_FIELDS} for row in reader]
+
+    if isinstance(data, dict):
+        data = data.get('students')
+    if not isinstance(data, list):
+        raise ImportFormatError("لازم تبعت ليست من الطلاب أو ملف CSV")
+    return 1, data
+
+
+def grade_lookup():
+    """Every grade keyed by its id and by its level, from a single query."""
+    lookup = {}
+    for grade in Grade.objects.all():
+        lookup[str(grade.id)] = grade
+        lookup.setdefault(grade.level.strip(), grade)
+    return lookup
+
+
+def import_students(rows, first_line=1, dry_run=False):
+    """
+    Validate every row in memory, then insert them all with bulk_create. Nothing
+    is written if any row fails. Returns ``(created, errors)``.
+    """
+    # one serializer per row so the valid rows keep their validated (whitespace-trimmed)
+    # values even when other rows fail; name collisions are checked on those
+    grades = grade_lookup()
+    validated, errors = [], {}
+    for index, row in enumerate(rows):
+        serializer = StudentImportSerializer(data=row, context={'grades': grades})
+        if serializer.is_valid():
+            validated.append((index, serializer.validated_data))
+        else:
+            errors[index] = dict(serializer.errors)
+
+    taken = set(
+        Student.objects.filter(name__in={values['name'] for _, values in validated}).values_list('name', flat=True)
+    )
+    seen = set()
+    for index, values in validated:
+        if values['name'] in taken or values['name'] in seen:
+            errors[index] = {'name': ["فيه طالب بنفس الاسم مسجل قبل كده"]}
+        seen.add(values['name'])
+
+    if errors:
+        return 0, [{'line': first_line + index, 'errors': errors[index]} for index in sorted(errors)]
+    if dry_run:
+        return len(rows), []
+
+    with transaction.atomic():
+        Student.objects.bulk_create(
+            [Student(**values) for _, values in validated],
+            batch_size=IMPORT_BATCH_SIZE,
+        )
+    return len(rows), []
@@ -0,0 +1,163 @@
+import logging
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger("api.requests")
+
+_IN_LIST = re.compile(r"\((?:\s*%s\s*,)+\s*%s\s*\)")
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+
+
+def sql_shape(sql):
+    """Collapse parameter lists and literals so repeated statements (N+1) group together."""
+    return _LITERALS.sub("?", _IN_LIST.sub("(...)", sql))
+
+
+class QueryRecorder:
+    """``connection.execute_wrapper`` callable counting queries and the time spent in them."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+            self.count += 1
+            self.shapes[sql_shape(sql)] += 1
+
+
+# The recorder of the request being served. sync_to_async copies the context into
+# its thread, so queries the ORM runs there are recorded too, whichever thread
+# (and thread-local connection) runs them.
+_current_recorder = ContextVar("query_recorder", default=None)
+
+
+def _record_query(execute, sql, params, many, context):
+    recorder = _current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """Put ``_record_query`` on every connection once, as the outermost wrapper."""
+    # first in the list: ``connection.execute_wrapper()`` pops the last one on exit
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _record_query)
+
+
+connection_created.connect(install_query_recorder)
+
+
+class RouteStats:
+    """Recent request durations per route, kept in memory by each worker process."""
+
+    def __init__(self, window=1000):
+        self.window = window
+        self.lock = threading.Lock()
+        self.samples = defaultdict(lambda: deque(maxlen=self.window))
+
+    def record(self, route, total_ms, db_ms, queries):
+        with self.lock:
+            self.samples[route].append((total_ms, db_ms, queries))
+
+    def summary(self):
+        with self.lock:
+            samples = {route: list(rows) for route, rows in self.samples.items()}
+        return {route: _summarize(rows) for route, rows in sorted(samples.items())}
+
+    def reset(self):
+        with self.lock:
+            self.samples.clear()
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(round(fraction * (len(values) - 1))))]
+
+
+def _summarize(rows):
+    totals = [row[0] for row in rows]
+    return {
+        "requests": len(rows),
+        "p50_ms": round(_percentile(totals, 0.5), 2),
+        "p95_ms": round(_percentile(totals, 0.95), 2),
+        "db_p95_ms": round(_percentile([row[1] for row in rows], 0.95), 2),
+        "queries_p95": _percentile([row[2] for row in rows], 0.95),
+    }
+
+
+route_stats = RouteStats()
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Counts SQL queries and DB time per request, adds a ``Server-Timing`` header and
+    logs requests slower than ``SLOW_REQUEST_MS`` with their most repeated SQL shapes.
+    Queries run while a streaming response is consumed are not included.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        token = _current_recorder.set(recorder)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+        return self.finish(request, response, recorder, started)
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        token = _current_recorder.set(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_recorder.reset(token)
+        return self.finish(request, response, recorder, started)
+
+    def finish(self, request, response, recorder, started):
+        total_ms = (time.perf_counter() - started) * 1000
+        db_ms = recorder.duration * 1000
+
+        response["Server-Timing"] = (
+            f'db;dur={db_ms:.1f};desc="{recorder.count} queries", '
+            f"app;dur={total_ms - db_ms:.1f}, total;dur={total_ms:.1f}"
+        )
+
+        match = getattr(request, "resolver_match", None)
+        route = f"{request.method} /{match.route}" if match else f"{request.method} <unresolved>"
+        route_stats.record(route, total_ms, db_ms, recorder.count)
+
+        if total_ms >= getattr(settings, "SLOW_REQUEST_MS", 500):
+            repeated = [(shape, n) for shape, n in recorder.shapes.most_common(3) if n > 1]
+            logger.warning(
+                "Slow request %s %.0fms (db %.0fms, %d queries)%s",
+                route, total_ms, db_ms, recorder.count,
+                "".join(f"\n  {n}x {shape[:300]}" for shape, n in repeated),
+            )
+        return response
+
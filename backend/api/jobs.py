@@ -0,0 +1,228 @@
+"""
+Background jobs without a broker.
+
+Heavy endpoints (``?async=1``) store a :class:`~api.models.Job` row and return
+its id right away; ``manage.py run_jobs`` claims queued rows with a
+conditional ``UPDATE`` (so several workers, or threads, never run the same
+job) and calls the handler registered for its ``kind``.
+
+Handlers work in chunks and call :func:`save_progress` after each one with a
+checkpoint describing where to pick up. A job whose worker disappears stops
+sending heartbeats; after ``JOB_STALE_SECONDS`` another worker claims it again
+and the handler resumes from the saved checkpoint, up to ``JOB_MAX_ATTEMPTS``.
+"""
+import csv
+import io
+import logging
+import os
+import socket
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .cache import bump_all_grades
+from .deletion import DELETE_BATCH_SIZE, delete_students
+from .exports import EXPORT_CHUNK_SIZE, sheet_rows
+from .importing import import_students
+from .models import Job, JobOutput, Student
+from .rollover import TERM_MODELS, clear_term
+
+logger = logging.getLogger("api.jobs")
+
+JOB_HANDLERS = {}
+
+
+def job_handler(kind):
+    def register(func):
+        JOB_HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, **params):
+    if kind not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job kind: {kind}")
+    return Job.objects.create(kind=kind, params=params)
+
+
+def save_progress(job, done=None, total=None, checkpoint=None):
+    """Record progress (and the resume point) and refresh the heartbeat."""
+    fields = {"heartbeat_at": timezone.now()}
+    for name, value in (("done", done), ("total", total), ("checkpoint", checkpoint)):
+        if value is not None:
+            fields[name] = value
+    for name, value in fields.items():
+        setattr(job, name, value)
+    Job.objects.filter(pk=job.pk).update(**fields)
+
+
+def finish(job, result, status=Job.DONE, error=""):
+    job.status, job.result, job.error, job.finished_at = status, result, error, timezone.now()
+    Job.objects.filter(pk=job.pk).update(
+        status=status, result=result, error=error, finished_at=job.finished_at, heartbeat_at=job.finished_at,
+    )
+
+
+def _stale_before():
+    return timezone.now() - timedelta(seconds=settings.JOB_STALE_SECONDS)
+
+
+def claim_job(worker):
+    """Take the oldest runnable job for ``worker`` or return None."""
+    stale = _stale_before()
+    Job.objects.filter(
+        status=Job.RUNNING, heartbeat_at__lt=stale, attempts__gte=settings.JOB_MAX_ATTEMPTS,
+    ).update(status=Job.FAILED, error="Gave up after the worker stopped responding.", finished_at=timezone.now())
+
+    runnable = Q(status=Job.QUEUED) | Q(status=Job.RUNNING, heartbeat_at__lt=stale)
+    for pk in Job.objects.filter(runnable).order_by("created_at", "id").values_list("pk", flat=True)[:10]:
+        now = timezone.now()
+        claimed = Job.objects.filter(runnable, pk=pk).update(
+            status=Job.RUNNING, worker=worker, heartbeat_at=now, attempts=F("attempts") + 1,
+        )
+        if claimed:
+            Job.objects.filter(pk=pk, started_at__isnull=True).update(started_at=now)
+            return Job.objects.get(pk=pk)
+    return None
+
+
+def run_job(job):
+    handler = JOB_HANDLERS.get(job.kind)
+    if handler is None:
+        finish(job, None, Job.FAILED, f"Unknown job kind: {job.kind}")
+        return job
+    try:
+        result = handler(job)
+    except Exception:
+        logger.exception("Job %s (%s) failed", job.pk, job.kind)
+        finish(job, None, Job.FAILED, traceback.format_exc())
+    else:
+        if job.status == Job.RUNNING:
+            finish(job, result)
+    return job
+
+
+def _worker_loop(name, once, poll_interval, stop):
+    while not stop.is_set():
+        job = claim_job(name)
+        if job is None:
+            if once:
+                return
+            stop.wait(poll_interval)
+            continue
+        logger.info("%s running job %s (%s)", name, job.pk, job.kind)
+        run_job(job)
+
+
+def _worker_thread(*args):
+    try:
+        _worker_loop(*args)
+    finally:
+        # each thread opened its own connections
+        connections.close_all()
+
+
+def work(concurrency=1, once=False, poll_interval=2.0, stop=None):
+    """
+    Run jobs on ``concurrency`` threads until ``stop`` is set, or, with
+    ``once``, until the queue is empty. A single worker runs inline.
+    """
+    stop = stop or threading.Event()
+    base = f"{socket.gethostname()}:{os.getpid()}"
+    if concurrency <= 1:
+        _worker_loop(base, once, poll_interval, stop)
+        return
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="job") as pool:
+        futures = [pool.submit(_worker_thread, f"{base}:{index}", once, poll_interval, stop) for index in range(concurrency)]
+        try:
+            for future in futures:
+                future.result()
+        except BaseException:
+            # let the other threads finish their current job, then stop
+            stop.set()
+            raise
+
+
+@job_handler("import_students")
+def _import_students(job):
+    params = job.params
+    # all or nothing, like the synchronous import: the rows and the job result commit together
+    with transaction.atomic():
+        created, errors = import_students(params["rows"], params.get("first_line", 1), params.get("dry_run", False))
+        result = {"dry_run": params.get("dry_run", False), "created": created, "errors": errors}
+        save_progress(job, done=len(params["rows"]), total=len(params["rows"]))
+        finish(job, result, Job.FAILED if errors else Job.DONE, "Some rows are invalid." if errors else "")
+    if created and not params.get("dry_run"):
+        bump_all_grades()
+
+
+@job_handler("export")
+def _export(job):
+    """CSV into JobOutput chunks; each chunk commits with its checkpoint."""
+    params = job.params
+    header, rows = sheet_rows(params["sheet"], params.get("grade"), params.get("from"), params.get("to"))
+    written = job.checkpoint.get("rows", 0)
+    seq = job.checkpoint.get("chunks", 0)
+    # drop anything written after the last checkpoint
+    JobOutput.objects.filter(job=job, seq__gte=seq).delete()
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if not seq:
+        buffer.write("\ufeff")  # so Excel opens Arabic text correctly
+        writer.writerow(header)
+    rows = islice(rows, written, None)
+    while True:
+        batch = list(islice(rows, EXPORT_CHUNK_SIZE))
+        writer.writerows(batch)
+        written += len(batch)
+        if buffer.tell():
+            with transaction.atomic():
+                JobOutput.objects.create(job=job, seq=seq, data=buffer.getvalue())
+                seq += 1
+                save_progress(job, done=written, checkpoint={"rows": written, "chunks": seq})
+            buffer.seek(0)
+            buffer.truncate()
+        if len(batch) < EXPORT_CHUNK_SIZE:
+            break
+    return {"file": f"job-{job.pk}-{params['sheet']}.csv", "rows": written}
+
+
+@job_handler("rollover")
+def _rollover(job):
+    save_progress(job, total=sum(model.objects.count() for model in TERM_MODELS))
+    # the rollover and the job result commit together, so a retried job never rolls over twice
+    with transaction.atomic():
+        archive = clear_term()
+        save_progress(job, done=sum(archive.counts.values()))
+        finish(job, {"archive": archive.pk, "deleted": archive.counts})
+    bump_all_grades()
+
+
+@job_handler("delete_students")
+def _delete_students(job):
+    ids = sorted({int(pk) for pk in job.params["ids"]})
+    last_id = job.checkpoint.get("last_id", 0)
+    deleted = job.checkpoint.get("deleted", 0)
+    remaining = [pk for pk in ids if pk > last_id]
+    if job.total is None:
+        save_progress(job, total=len(ids))
+
+    for start in range(0, len(remaining), DELETE_BATCH_SIZE):
+        chunk = remaining[start:start + DELETE_BATCH_SIZE]
+        # a chunk and its checkpoint commit together, so a resumed job never repeats one
+        with transaction.atomic():
+            deleted += delete_students(Student.objects.filter(pk__in=chunk))
+            save_progress(
+                job,
+                done=len(ids) - len(remaining) + start + len(chunk),
+                checkpoint={"last_id": chunk[-1], "deleted": deleted},
+            )
+    return {"deleted": deleted}
@@ -0,0 +1,62 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from api.benchmarks import run_connection_benchmark
+from core.db_profiles import PROFILES, database_settings
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the database connection profiles (see core/db_profiles.py) against a real "
+        "Postgres: requests/sec, latency and connections opened by concurrent workers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default=os.getenv("DATABASE_URL") or os.getenv("POSTGRES_URL"),
+                            help="Postgres URL (default: DATABASE_URL / POSTGRES_URL)")
+        parser.add_argument("--pgbouncer-url", help="the same database through PgBouncer (transaction mode)")
+        parser.add_argument("--profiles", default=",".join(PROFILES), help="comma separated profiles to run")
+        parser.add_argument("--threads", type=int, default=8, help="concurrent simulated workers")
+        parser.add_argument("--requests", type=int, default=200, help="requests per worker")
+        parser.add_argument("--no-ssl", action="store_true", help="don't require TLS (local Postgres)")
+        parser.add_argument("--output", default="bench_db_profiles.json", help="where to write the JSON report")
+
+    def handle(self, *args, **options):
+        if not options["url"]:
+            raise CommandError("Pass --url or set DATABASE_URL to a Postgres database.")
+        env = {**os.environ, "DB_SSL_REQUIRE": "false" if options["no_ssl"] else "true"}
+        env.pop("DATABASE_URL", None)  # dj_database_url would prefer it over --url
+
+        report = {"threads": options["threads"], "requests_per_thread": options["requests"], "runs": {}}
+        for profile in [name.strip() for name in options["profiles"].split(",") if name.strip()]:
+            url = options["pgbouncer_url"] if profile == "pgbouncer" else options["url"]
+            if not url:
+                self.stderr.write(self.style.WARNING(f"Skipping {profile}: no --pgbouncer-url"))
+                continue
+            alias = f"bench_{profile}"
+            # configure_settings fills in Django's per-database defaults; it insists on a default alias
+            connections.settings[alias] = connections.configure_settings(
+                {DEFAULT_DB_ALIAS: connections.settings[DEFAULT_DB_ALIAS], alias: database_settings(url, profile, env)}
+            )[alias]
+            try:
+                report["runs"][profile] = run_connection_benchmark(alias, options["threads"], options["requests"])
+            finally:
+                pool = getattr(connections[alias], "pool", None)
+                if pool is not None and profile in report["runs"]:
+                    stats = report["runs"][profile]["pool_stats"] = pool.get_stats()
+                    # connection_created fires on every checkout from the pool; count real opens instead
+                    report["runs"][profile]["connects"] = stats["connections_num"]
+                    connections[alias].close_pool()
+                del connections.settings[alias]
+
+        with open(options["output"], "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+        for profile, run in report["runs"].items():
+            self.stdout.write(
+                f"{profile:<11} {run['rps']:>9} req/s   p50 {run['p50_ms']:>7} ms   p95 {run['p95_ms']:>7} ms   "
+                f"connects {run['connects']}"
+            )
+        self.stdout.write(f"Report written to {options['output']}")
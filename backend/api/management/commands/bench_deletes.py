@@ -0,0 +1,31 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from api.benchmarks import run_delete_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare deleting a grade's students through Django's collector with the chunked "
+        "set-based delete, as the students' history grows. Nothing is kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=200)
+        parser.add_argument("--days", default="10,60,180", help="comma separated follow-ups per student")
+        parser.add_argument("--months", type=int, default=10)
+        parser.add_argument("--output", default="bench_deletes.json", help="where to write the JSON report")
+
+    def handle(self, *args, **options):
+        days_list = [int(days) for days in options["days"].split(",") if days.strip()]
+        report = run_delete_benchmark(options["students"], days_list, options["months"])
+        with open(options["output"], "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+
+        for run in report["runs"]:
+            self.stdout.write(
+                f"{run['strategy']:<10} {run['history_rows']:>8} rows   queries {run['queries']:>5}   "
+                f"ms {run['wall_ms']:>9.1f}   peak KiB {run['peak_kib']:>9.1f}"
+            )
+        self.stdout.write(f"Report written to {options['output']}")
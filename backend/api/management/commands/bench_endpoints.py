@@ -0,0 +1,35 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmarks import run_endpoint_benchmark, uncovered_routes
+
+
+class Command(BaseCommand):
+    help = (
+        "Run every API endpoint at several dataset sizes and record wall time, SQL query "
+        "count and response size. Fails when a query count grows with the dataset where it shouldn't."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="10,50,200", help="comma separated students per grade")
+        parser.add_argument("--output", default="bench_endpoints.json", help="where to write the JSON report")
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options["sizes"].split(",") if size.strip()]
+        missing = uncovered_routes()
+        if missing:
+            self.stderr.write(self.style.WARNING(f"No benchmark case for: {', '.join(missing)}"))
+
+        report, failures = run_endpoint_benchmark(sizes)
+        with open(options["output"], "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2, ensure_ascii=False)
+
+        for endpoint in report["endpoints"]:
+            counts = " ".join(f"{run['queries']:>4}" for run in endpoint["runs"])
+            times = " ".join(f"{run['wall_ms']:>8.1f}" for run in endpoint["runs"])
+            self.stdout.write(f"{endpoint['method']:<6} {endpoint['route']:<32} queries {counts}   ms {times}")
+        self.stdout.write(f"Report written to {options['output']}")
+
+        if failures:
+            raise CommandError("Benchmark regressions:\n" + "\n".join(failures))
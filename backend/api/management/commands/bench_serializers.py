@@ -0,0 +1,33 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from api.benchmarks import run_serializer_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Rows/sec of the follow-up and quiz grid listings through their ModelSerializer and "
+        "through the values_list() fast path, rendered with DRF's JSONRenderer and with the "
+        "orjson renderer. Nothing is kept."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--students", type=int, default=300)
+        parser.add_argument("--days", type=int, default=20, help="follow-ups per student")
+        parser.add_argument("--months", type=int, default=10, help="quizzes per student")
+        parser.add_argument("--repeat", type=int, default=3, help="runs per measurement (the best is kept)")
+        parser.add_argument("--output", default="bench_serializers.json", help="where to write the JSON report")
+
+    def handle(self, *args, **options):
+        report = run_serializer_benchmark(options["students"], options["days"], options["months"], options["repeat"])
+        with open(options["output"], "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+
+        for run in report["runs"]:
+            self.stdout.write(
+                f"{run['listing']:<10} {run['path']:<10} {run['renderer']:<16} {run['rows']:>7} rows   "
+                f"serialize {run['serialize_ms']:>8.1f} ms   render {run['render_ms']:>7.1f} ms   "
+                f"{run['rows_per_sec']:>8} rows/s"
+            )
+        self.stdout.write(f"Report written to {options['output']}")
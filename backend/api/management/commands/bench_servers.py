@@ -0,0 +1,103 @@
+import importlib.util
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from api.benchmarks import load_test
+from api.models import DailyFollowUp, Grade
+
+ASGI_PATHS = ["async/quizzes/?grade={grade}", "async/payments/?grade={grade}",
+              "async/daily-followups/?grade={grade}&date={date}", "async/students/search/bench"]
+WSGI_PATHS = [path.removeprefix("async/") for path in ASGI_PATHS]
+
+
+def _wait_for_port(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise CommandError(f"Server on port {port} exited with code {process.returncode}")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise CommandError(f"Server on port {port} did not start within {timeout}s")
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent-client throughput of the async grid/search views under uvicorn (ASGI) "
+        "with the sync views under a threaded WSGI server, one worker each, against the configured "
+        "database (seed it with seed_bench first). The grid cache is disabled for both."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--servers", default="asgi,wsgi", help="comma separated: asgi, wsgi")
+        parser.add_argument("--clients", type=int, default=16, help="concurrent clients")
+        parser.add_argument("--requests", type=int, default=25, help="requests per client")
+        parser.add_argument("--threads", type=int, default=4, help="threads of the WSGI worker")
+        parser.add_argument("--grade", type=int, help="grade to load (default: the largest)")
+        parser.add_argument("--port", type=int, default=8100, help="first port to use")
+        parser.add_argument("--output", default="bench_servers.json", help="where to write the JSON report")
+
+    def server_command(self, kind, port, threads):
+        if kind == "asgi":
+            if importlib.util.find_spec("uvicorn") is None:
+                raise CommandError("uvicorn is not installed: pip install uvicorn")
+            return [sys.executable, "-m", "uvicorn", "core.asgi:application",
+                    "--port", str(port), "--workers", "1", "--log-level", "warning", "--no-access-log"]
+        if importlib.util.find_spec("gunicorn") is not None:
+            return [sys.executable, "-m", "gunicorn", "core.wsgi:application", "--bind", f"127.0.0.1:{port}",
+                    "--workers", "1", "--threads", str(threads), "--log-level", "warning"]
+        # Django's threaded development server: one thread per request
+        return [sys.executable, "manage.py", "runserver", "--noreload", f"127.0.0.1:{port}"]
+
+    def handle(self, *args, **options):
+        grades = Grade.objects.annotate(size=Count("students")).order_by("-size")
+        grade = grades.filter(pk=options["grade"]).first() if options["grade"] else grades.first()
+        if grade is None:
+            raise CommandError("No grades to load; run seed_bench first.")
+        day = (
+            DailyFollowUp.objects.filter(student__grade=grade).order_by("-date").values_list("date", flat=True).first()
+        )
+        fill = {"grade": grade.id, "date": day.isoformat() if day else time.strftime("%Y-%m-%d")}
+
+        env = {
+            **os.environ,
+            "GRID_CACHE_ENABLED": "false",
+            "REQUEST_STATS_ENABLED": "false",
+            "ALLOWED_HOSTS_DEPLOY": ",".join(filter(None, [os.environ.get("ALLOWED_HOSTS_DEPLOY"), "127.0.0.1"])),
+        }
+        report = {"grade": grade.id, "clients": options["clients"], "requests_per_client": options["requests"], "runs": {}}
+        servers = [kind.strip() for kind in options["servers"].split(",") if kind.strip()]
+        for offset, kind in enumerate(servers):
+            port = options["port"] + offset
+            paths = [path.format(**fill) for path in (ASGI_PATHS if kind == "asgi" else WSGI_PATHS)]
+            process = subprocess.Popen(
+                self.server_command(kind, port, options["threads"]), cwd=settings.BASE_DIR, env=env,
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            try:
+                _wait_for_port(port, process)
+                base_url = f"http://127.0.0.1:{port}/api/"
+                load_test(base_url, paths, 2, 2)  # warm up
+                report["runs"][kind] = load_test(base_url, paths, options["clients"], options["requests"])
+            finally:
+                process.terminate()
+                process.wait(timeout=10)
+
+        with open(options["output"], "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+        for kind, run in report["runs"].items():
+            self.stdout.write(
+                f"{kind:<5} {run['rps']:>8} req/s   p50 {run['p50_ms']} ms   p95 {run['p95_ms']} ms   "
+                f"errors {run['errors']}"
+            )
+        self.stdout.write(f"Report written to {options['output']}")
@@ -0,0 +1,41 @@
+import json
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.benchmarks import measure_startup
+
+MODES = {"full": "false", "api-only": "true"}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure cold-start cost of the default settings and of API_ONLY=true: loading the WSGI "
+        "app, the first request and a warm one, each in a fresh interpreter against the "
+        "configured database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--modes", default=",".join(MODES), help="comma separated: " + ", ".join(MODES))
+        parser.add_argument("--path", default="/api/grades/", help="path of the first request")
+        parser.add_argument("--runs", type=int, default=5, help="cold starts per mode (the median is reported)")
+        parser.add_argument("--output", default="bench_startup.json", help="where to write the JSON report")
+
+    def handle(self, *args, **options):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": settings.SETTINGS_MODULE, "REQUEST_STATS_ENABLED": "false"}
+        report = {"path": options["path"], "modes": {}}
+        for mode in (mode.strip() for mode in options["modes"].split(",") if mode.strip()):
+            report["modes"][mode] = measure_startup(
+                {**env, "API_ONLY": MODES[mode]}, options["path"], options["runs"],
+            )
+
+        with open(options["output"], "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+        for mode, run in report["modes"].items():
+            self.stdout.write(
+                f"{mode:<9} app {run['import_ms']:>6} ms   first request {run['first_request_ms']:>6} ms   "
+                f"warm {run['warm_request_ms']:>5} ms   process {run['process_ms']:>6} ms   "
+                f"{run['modules']} modules   HTTP {run['status']}"
+            )
+        self.stdout.write(f"Report written to {options['output']}")
@@ -0,0 +1,113 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from api.models import DailyFollowUp, MonthlyPayment, PaymentMonth, Quiz, Student
+from api.seeding import seed
+
+# the indexes added for the API's access paths (migration 0010)
+TUNED_INDEXES = {
+    DailyFollowUp: ["followup_date_student", "followup_absences"],
+    Student: ["student_grade_id"],
+    PaymentMonth: ["month_order"],
+}
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a large dataset and print the query plan of every API query with and "
+        "without the tuned indexes. Runs in a transaction that is rolled back unless --keep. "
+        "The indexes are dropped and recreated inside that transaction, which holds ACCESS "
+        "EXCLUSIVE locks on their tables (blocking every read and write) until it ends, so "
+        "anything but a local SQLite database needs --allow-table-locks: use a scratch copy, "
+        "never production."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--grades", type=int, default=10)
+        parser.add_argument("--students", type=int, default=200, help="students per grade")
+        parser.add_argument("--months", type=int, default=10)
+        parser.add_argument("--days", type=int, default=120)
+        parser.add_argument("--keep", action="store_true", help="commit the seeded data")
+        parser.add_argument(
+            "--allow-table-locks", action="store_true",
+            help="run on a server database, locking the indexed tables for the whole run",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite" and not options["allow_table_locks"]:
+            raise CommandError(
+                f"explain_queries drops indexes and locks {connection.settings_dict['NAME']!r} tables until it "
+                "finishes; point it at a scratch copy and pass --allow-table-locks."
+            )
+        try:
+            with transaction.atomic():
+                self.run(options)
+                if not options["keep"]:
+                    raise _Rollback
+        except _Rollback:
+            self.stdout.write("Rolled back the seeded data.")
+
+    def run(self, options):
+        self.stdout.write("Seeding...")
+        grades = seed(
+            grades=options["grades"],
+            students_per_grade=options["students"],
+            months=options["months"],
+            days=options["days"],
+        )
+        grade = grades[len(grades) // 2]
+        student = Student.objects.filter(grade=grade).order_by("id").first()
+        day = DailyFollowUp.objects.filter(student=student).order_by("-date").values_list("date", flat=True).first()
+
+        queries = {
+            "daily follow-up sheet": DailyFollowUp.objects.filter(student__grade_id=grade.id, date=day).select_related("student"),
+            "profile absences": DailyFollowUp.objects.filter(student=student, is_absent=True).order_by("date"),
+            "students by grade": Student.objects.filter(grade_id=grade.id).order_by("grade_id", "id"),
+            "payment months": PaymentMonth.objects.all(),
+            "payments grid": MonthlyPayment.objects.filter(student__grade_id=grade.id).values_list("student_id", "month_id", "id", "is_paid"),
+            "quizzes grid": Quiz.objects.filter(student__grade_id=grade.id).select_related("student", "month"),
+        }
+
+        self.toggle_indexes(create=False)
+        self.analyze()
+        before = {label: self.explain(qs) for label, qs in queries.items()}
+
+        self.toggle_indexes(create=True)
+        self.analyze()
+        after = {label: self.explain(qs) for label, qs in queries.items()}
+
+        for label in queries:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"\n== {label}"))
+            self.stdout.write(self.style.WARNING("-- without tuned indexes"))
+            self.stdout.write(before[label])
+            self.stdout.write(self.style.SUCCESS("-- with tuned indexes"))
+            self.stdout.write(after[label])
+
+    def toggle_indexes(self, create):
+        # raw DDL rather than `with schema_editor()`, which SQLite refuses inside atomic()
+        editor = connection.schema_editor()
+        editor.deferred_sql = []
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                # the seeded rows leave deferred FK checks pending, and Postgres refuses DDL on
+                # tables with pending trigger events
+                cursor.execute("SET CONSTRAINTS ALL IMMEDIATE")
+            for model, names in TUNED_INDEXES.items():
+                for index in model._meta.indexes:
+                    if index.name in names:
+                        sql = index.create_sql(model, editor) if create else index.remove_sql(model, editor)
+                        cursor.execute(str(sql))
+
+    def analyze(self):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+
+    def explain(self, queryset):
+        if connection.vendor == "postgresql":
+            return queryset.explain(analyze=True, buffers=True)
+        return queryset.explain()
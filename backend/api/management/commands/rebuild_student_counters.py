@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from api.counters import REBUILD_BATCH_SIZE, rebuild_all_counters
+
+
+class Command(BaseCommand):
+    help = "Recompute Student.absence_count, unpaid_months and latest_degree from the source tables, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=REBUILD_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        done = rebuild_all_counters(
+            batch_size=options["batch_size"],
+            progress=lambda count: self.stdout.write(f"  {count} students"),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt counters for {done} students."))
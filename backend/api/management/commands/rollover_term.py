@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from api.rollover import rollover_term
+
+
+class Command(BaseCommand):
+    help = "Archive this term's follow-ups, payments, quizzes and months to the archive tables, then clear them."
+
+    def handle(self, *args, **options):
+        archive = rollover_term(
+            progress=lambda stage, label, count: self.stdout.write(f"  {stage} {label}: {count}"),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Term archive {archive.pk}: {archive.counts}"))
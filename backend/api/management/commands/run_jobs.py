@@ -0,0 +1,22 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from api.jobs import work
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs (imports, exports, rollovers, bulk deletes) from the Job table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", type=int, default=2, help="jobs to run at the same time")
+        parser.add_argument("--once", action="store_true", help="exit when the queue is empty instead of polling")
+        parser.add_argument("--poll-interval", type=float, default=2.0, help="seconds between polls when idle")
+
+    def handle(self, *args, **options):
+        if options["verbosity"] > 1:
+            logging.getLogger("api.jobs").setLevel(logging.INFO)
+        try:
+            work(concurrency=options["concurrency"], once=options["once"], poll_interval=options["poll_interval"])
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped; running jobs will be picked up again from their last checkpoint.")
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.seeding import seed
+
+
+class Command(BaseCommand):
+    help = "Generate a synthetic dataset of grades, students, months, follow-ups, payments and quizzes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--grades", type=int, default=5)
+        parser.add_argument("--students", type=int, default=100, help="students per grade")
+        parser.add_argument("--months", type=int, default=10)
+        parser.add_argument("--days", type=int, default=60, help="daily follow-ups per student")
+        parser.add_argument("--absence-rate", type=float, default=0.1)
+        parser.add_argument("--seed", type=int, default=0, help="random seed")
+        parser.add_argument("--prefix", default="bench", help="prefix for generated grade and month names")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            grades = seed(
+                grades=options["grades"],
+                students_per_grade=options["students"],
+                months=options["months"],
+                days=options["days"],
+                absence_rate=options["absence_rate"],
+                seed_value=options["seed"],
+                prefix=options["prefix"],
+            )
+        students = options["grades"] * options["students"]
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {len(grades)} grades, {students} students, {options['months']} months, "
+            f"{students * options['days']} follow-ups and {students * options['months']} payments/quizzes."
+        ))
@@ -0,0 +1,38 @@
+from django.db import migrations
+
+
+def merge_duplicate_quizzes(apps, schema_editor):
+    """Keep the oldest quiz per (student, month) and fold the others' notes into it."""
+    Quiz = apps.get_model('api', 'Quiz')
+    db_alias = schema_editor.connection.alias
+
+    seen = {}
+    duplicate_ids = []
+    for quiz in Quiz.objects.using(db_alias).order_by('student_id', 'month_id', 'id').iterator():
+        key = (quiz.student_id, quiz.month_id)
+        keeper = seen.get(key)
+        if keeper is None:
+            seen[key] = quiz
+            continue
+        duplicate_ids.append(quiz.id)
+        notes = (quiz.notes or '').strip()
+        if notes and notes not in (keeper.notes or ''):
+            keeper.notes = f"{keeper.notes}\n{notes}" if keeper.notes else notes
+            keeper._merged = True
+
+    merged = [quiz for quiz in seen.values() if getattr(quiz, '_merged', False)]
+    if merged:
+        Quiz.objects.using(db_alias).bulk_update(merged, ['notes'], batch_size=500)
+    for start in range(0, len(duplicate_ids), 500):
+        Quiz.objects.using(db_alias).filter(id__in=duplicate_ids[start:start + 500]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_alter_dailyfollowup_notes_alter_quiz_notes_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_quizzes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,15 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_merge_duplicate_quizzes'),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='quiz',
+            unique_together={('student', 'month')},
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:00
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+TRIGRAM_INDEX = 'api_student_search_name_trgm'
+
+
+def create_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        f'CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} ON api_student USING gin (search_name gin_trgm_ops)'
+    )
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {TRIGRAM_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_alter_quiz_unique_together'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='search_name',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(django.db.models.functions.text.Replace(django.db.models.functions.text.Lower('name'), models.Value('أ'), models.Value('ا')), models.Value('إ'), models.Value('ا')), models.Value('آ'), models.Value('ا')), models.Value('ٱ'), models.Value('ا')), models.Value('ى'), models.Value('ي')), models.Value('ة'), models.Value('ه')), models.Value('ـ'), models.Value('')), output_field=models.CharField(max_length=200)),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['contact_phone'], name='student_phone_prefix', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['additional_phone'], name='student_add_phone_prefix', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
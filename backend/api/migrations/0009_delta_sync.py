@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_student_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=50)),
+                ('object_id', models.BigIntegerField()),
+                ('grade_id', models.BigIntegerField(blank=True, null=True)),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='dailyfollowup',
+            index=models.Index(fields=['updated_at', 'student'], name='followup_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='monthlypayment',
+            index=models.Index(fields=['updated_at', 'student'], name='payment_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='quiz',
+            index=models.Index(fields=['updated_at', 'student'], name='quiz_sync'),
+        ),
+        migrations.AddIndex(
+            model_name='tombstone',
+            index=models.Index(fields=['model', 'grade_id', 'deleted_at'], name='tombstone_grade_sync'),
+        ),
+    ]
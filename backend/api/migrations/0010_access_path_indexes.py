@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_delta_sync'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='dailyfollowup',
+            index=models.Index(fields=['date', 'student'], name='followup_date_student'),
+        ),
+        migrations.AddIndex(
+            model_name='dailyfollowup',
+            index=models.Index(condition=models.Q(('is_absent', True)), fields=['student', 'date'], name='followup_absences'),
+        ),
+        migrations.AddIndex(
+            model_name='paymentmonth',
+            index=models.Index(fields=['order'], name='month_order'),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['grade', 'id'], name='student_grade_id'),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.6 on 2026-10-18 13:09
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_counters(apps, schema_editor):
+    Student = apps.get_model('api', 'Student')
+    DailyFollowUp = apps.get_model('api', 'DailyFollowUp')
+    MonthlyPayment = apps.get_model('api', 'MonthlyPayment')
+
+    def count(queryset):
+        return Coalesce(Subquery(
+            queryset.filter(student=OuterRef('pk')).order_by().values('student')
+            .annotate(value=Count('id')).values('value')
+        ), 0)
+
+    latest = DailyFollowUp.objects.filter(student=OuterRef('pk'), degree__isnull=False).order_by('-date', '-id')
+    Student.objects.using(schema_editor.connection.alias).update(
+        absence_count=count(DailyFollowUp.objects.filter(is_absent=True)),
+        unpaid_months=count(MonthlyPayment.objects.filter(is_paid=False)),
+        latest_degree=Subquery(latest.values('degree')[:1]),
+        latest_degree_date=Subquery(latest.values('date')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_access_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='absence_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='latest_degree',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=6, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='latest_degree_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='student',
+            name='unpaid_months',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
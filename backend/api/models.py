@@ -1,5 +1,6 @@
 from django.db import models
 from datetime import date
+from .search import normalized_expression
 
 class Grade(models.Model):
     level = models.CharField(max_length=100)
@@ -16,6 +17,25 @@ class Student(models.Model):
     initial_level = models.TextField(null=True, blank=True)
     notes = models.TextField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    # denormalized from followups/payments for sorting and filtering, see api/counters.py
+    absence_count = models.IntegerField(default=0)
+    unpaid_months = models.IntegerField(default=0)
+    latest_degree = models.DecimalField(max_digits=6, decimal_places=2, blank=True, null=True)
+    latest_degree_date = models.DateField(blank=True, null=True)
+    # folded copy of name kept by the database, backs the trigram search index
+    search_name = models.GeneratedField(
+        expression=normalized_expression("name"),
+        output_field=models.CharField(max_length=200),
+        db_persist=True,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["contact_phone"], name="student_phone_prefix", opclasses=["varchar_pattern_ops"]),
+            models.Index(fields=["additional_phone"], name="student_add_phone_prefix", opclasses=["varchar_pattern_ops"]),
+            # grade listings and keyset pagination walk (grade_id, id)
+            models.Index(fields=["grade", "id"], name="student_grade_id"),
+        ]
 
     def __str__(self):
         return self.name
@@ -31,6 +51,24 @@ class DailyFollowUp(models.Model):
 
     class Meta:
         unique_together = ("student", "date")
+        indexes = [
+            models.Index(fields=["updated_at", "student"], name="followup_sync"),
+            # one day's sheet for a grade: date first, then join to the grade's students
+            models.Index(fields=["date", "student"], name="followup_date_student"),
+            # profile absence list; absences are a small fraction of all rows
+            models.Index(
+                fields=["student", "date"],
+                name="followup_absences",
+                condition=models.Q(is_absent=True),
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # remembered so counter signals can tell what changed on save
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
 
     def __str__(self):
         return f"{self.student.name} - {self.date}"
@@ -42,6 +80,9 @@ class PaymentMonth(models.Model):
 
     class Meta:
         ordering = ["order"]
+        indexes = [
+            models.Index(fields=["order"], name="month_order"),
+        ]
 
     def __str__(self):
         return self.name
@@ -55,6 +96,15 @@ class MonthlyPayment(models.Model):
 
     class Meta:
         unique_together = ("student", "month")
+        indexes = [
+            models.Index(fields=["updated_at", "student"], name="payment_sync"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
 
     def __str__(self):
         return f"{self.student.name} - {self.month.name} - {'Paid' if self.is_paid else 'Not Paid'}"
@@ -66,5 +116,131 @@ class Quiz(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        unique_together = ("student", "month")
+        indexes = [
+            models.Index(fields=["updated_at", "student"], name="quiz_sync"),
+        ]
+
     def __str__(self):
-        return f"{self.student.name} - {self.month}"
\ No newline at end of file
+        return f"{self.student.name} - {self.month}"
+
+class Tombstone(models.Model):
+    """Deleted grid rows, kept so delta sync clients (``?since=``) can drop them."""
+    model = models.CharField(max_length=50)
+    object_id = models.BigIntegerField()
+    # plain column rather than a FK: the grade may be deleted too
+    grade_id = models.BigIntegerField(null=True, blank=True)
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["model", "grade_id", "deleted_at"], name="tombstone_grade_sync"),
+        ]
+
+    def __str__(self):
+        return f"{self.model} #{self.object_id}"
+
+
+class TermArchive(models.Model):
+    """A term rollover: how many rows of each kind were archived and cleared."""
+    counts = models.JSONField(default=dict)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"Term archive {self.created_at:%Y-%m-%d}"
+
+
+class ArchivedRow(models.Model):
+    """
+    A row cleared by a term rollover, copied with ``INSERT ... SELECT`` (see
+    api/rollover.py). Ids of other rows are plain integers: the students and
+    months they point at may be gone by the time the archive is read.
+    """
+    archive = models.ForeignKey(TermArchive, on_delete=models.CASCADE, related_name="+")
+    original_id = models.BigIntegerField()
+
+    class Meta:
+        abstract = True
+
+
+class ArchivedPaymentMonth(ArchivedRow):
+    name = models.CharField(max_length=50)
+    order = models.PositiveIntegerField()
+
+
+class ArchivedStudentRow(ArchivedRow):
+    student_id = models.BigIntegerField()
+    student_name = models.CharField(max_length=200)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        abstract = True
+
+
+class ArchivedDailyFollowUp(ArchivedStudentRow):
+    date = models.DateField()
+    is_absent = models.BooleanField()
+    degree = models.DecimalField(max_digits=6, decimal_places=2, null=True)
+    notes = models.TextField(null=True)
+
+
+class ArchivedMonthlyPayment(ArchivedStudentRow):
+    month_id = models.BigIntegerField()
+    is_paid = models.BooleanField()
+
+
+class ArchivedQuiz(ArchivedStudentRow):
+    month_id = models.BigIntegerField()
+    notes = models.TextField(null=True)
+
+
+class Job(models.Model):
+    """A unit of background work picked up by ``manage.py run_jobs``, see api/jobs.py."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [(QUEUED, "Queued"), (RUNNING, "Running"), (DONE, "Done"), (FAILED, "Failed")]
+
+    kind = models.CharField(max_length=50)
+    params = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    done = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    # handler-defined resume point, saved after every chunk
+    checkpoint = models.JSONField(default=dict, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True, default="")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"], name="job_queue"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk} ({self.status})"
+
+
+class JobOutput(models.Model):
+    """
+    One chunk of the file a job produced, kept in the database so any web
+    process can serve it whichever host ran the job. The file is the chunks
+    in ``seq`` order.
+    """
+    job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name="output")
+    seq = models.PositiveIntegerField()
+    data = models.TextField()
+
+    class Meta:
+        unique_together = ("job", "seq")
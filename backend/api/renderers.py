@@ -0,0 +1,49 @@
+"""
+Faster JSON rendering with orjson, when it is installed.
+
+The output is the same bytes DRF's JSONRenderer writes with this project's
+settings: compact, non-ASCII kept, U+2028/U+2029 escaped, datetimes as ISO 8601
+with ``Z`` for UTC and decimals as numbers. orjson encodes dicts, strings,
+dates and datetimes itself; anything else goes through DRF's encoder. Without
+orjson, or for output it can't produce (integers over 64 bits, ``?indent=``),
+this falls back to the standard library.
+"""
+import json
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+_default = JSONEncoder().default
+
+
+def _escape(content):
+    # like DRF: these are valid JSON but end a line in JavaScript source
+    if b"\xe2\x80\xa8" in content or b"\xe2\x80\xa9" in content:
+        content = content.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
+    return content
+
+
+def dumps(data):
+    """``data`` as compact UTF-8 JSON."""
+    if orjson is not None:
+        try:
+            return _escape(orjson.dumps(data, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z))
+        except orjson.JSONEncodeError:
+            pass
+    return _escape(
+        json.dumps(data, cls=JSONEncoder, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    )
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        if self.ensure_ascii or not self.compact or self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
@@ -0,0 +1,97 @@
+"""
+Term rollover: archive the term's follow-ups, payments, quizzes and months, then clear them.
+
+``Model.objects.all().delete()`` makes Django's collector load every row (and
+fire the per-row signals) before deleting, which is what made ``delete-all/``
+time out on a full year of roll calls and lose the history. Here each table
+is copied into its archive table (``Archived*`` in api/models.py) with one
+``INSERT ... SELECT`` and then cleared with one ``DELETE`` of exactly the rows
+that were copied, all in the database and in one transaction: the archive
+survives wherever the database does, and either the whole rollover happens or
+none of it.
+"""
+from django.db import connection, transaction
+
+from .cache import bump_all_grades
+from .models import (
+    ArchivedDailyFollowUp, ArchivedMonthlyPayment, ArchivedPaymentMonth, ArchivedQuiz, DailyFollowUp,
+    MonthlyPayment, PaymentMonth, Quiz, Student, TermArchive, Tombstone,
+)
+
+# children before the months they point at, each with its archive table and the columns copied as-is
+TERM_MODELS = [DailyFollowUp, MonthlyPayment, Quiz, PaymentMonth]
+ARCHIVES = {
+    DailyFollowUp: (ArchivedDailyFollowUp, ["date", "is_absent", "degree", "notes", "created_at", "updated_at"]),
+    MonthlyPayment: (ArchivedMonthlyPayment, ["month_id", "is_paid", "created_at", "updated_at"]),
+    Quiz: (ArchivedQuiz, ["month_id", "notes", "created_at", "updated_at"]),
+    PaymentMonth: (ArchivedPaymentMonth, ["name", "order"]),
+}
+
+
+def _table(model):
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def _archive_model(cursor, archive, model):
+    archived, columns = ARCHIVES[model]
+    targets = ["archive_id", "original_id", *columns]
+    sources = ["%s", "src.id", *(f"src.{connection.ops.quote_name(column)}" for column in columns)]
+    join = ""
+    if model is not PaymentMonth:
+        targets += ["student_id", "student_name"]
+        sources += ["src.student_id", "student.name"]
+        join = f"JOIN {_table(Student)} student ON student.id = src.student_id"
+    cursor.execute(
+        f"INSERT INTO {_table(archived)} ({', '.join(connection.ops.quote_name(name) for name in targets)}) "
+        f"SELECT {', '.join(sources)} FROM {_table(model)} src {join}",
+        [archive.pk],
+    )
+    return cursor.rowcount
+
+
+def _clear_model(cursor, archive, model):
+    """One set-based ``DELETE`` of the archived rows: no collector, no per-row signals."""
+    archived, _ = ARCHIVES[model]
+    cursor.execute(
+        f"DELETE FROM {_table(model)} WHERE id IN "
+        f"(SELECT original_id FROM {_table(archived)} WHERE archive_id = %s)",
+        [archive.pk],
+    )
+    return cursor.rowcount
+
+
+def clear_term(progress=None):
+    """
+    Archive and delete the term's rows, reset the counters and tombstones and
+    return the TermArchive. Call it inside a transaction.
+
+    ``progress(stage, model_label, count)`` is called after every archived and
+    every cleared table.
+    """
+    archive = TermArchive.objects.create()
+    counts = {}
+    with connection.cursor() as cursor:
+        for model in TERM_MODELS:
+            label = model._meta.label_lower
+            archived = _archive_model(cursor, archive, model)
+            if progress:
+                progress("archive", label, archived)
+            # rows written after the copy aren't in the archive, so they are kept
+            counts[model._meta.model_name] = _clear_model(cursor, archive, model) if archived else 0
+            if progress:
+                progress("clear", label, counts[model._meta.model_name])
+
+    # the old term's tombstones are meaningless now; delta clients see ``reset`` instead
+    Tombstone.objects.all().delete()
+    Student.objects.update(absence_count=0, unpaid_months=0, latest_degree=None, latest_degree_date=None)
+    archive.counts = counts
+    archive.save(update_fields=["counts"])
+    return archive
+
+
+def rollover_term(progress=None):
+    """Archive and clear the term's data in one transaction, keeping grades and students."""
+    with transaction.atomic():
+        archive = clear_term(progress)
+    bump_all_grades()
+    return archive
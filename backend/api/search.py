@@ -0,0 +1,69 @@
+from django.db import connection
+from django.db.models import Case, CharField, IntegerField, Q, Value, When
+from django.db.models.functions import Length, Lower, Replace
+
+# alef/ya/ta-marbuta folding plus tatweel removal, applied both to the stored
+# Student.search_name column and to the search term
+ARABIC_FOLDING = (
+    ("أ", "ا"),
+    ("إ", "ا"),
+    ("آ", "ا"),
+    ("ٱ", "ا"),
+    ("ى", "ي"),
+    ("ة", "ه"),
+    ("ـ", ""),
+)
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+
+def normalize_arabic(value):
+    value = value.strip().lower()
+    for source, target in ARABIC_FOLDING:
+        value = value.replace(source, target)
+    return " ".join(value.split())
+
+
+def normalized_expression(field):
+    expression = Lower(field)
+    for source, target in ARABIC_FOLDING:
+        expression = Replace(expression, Value(source), Value(target))
+    return expression
+
+
+def search_students(queryset, value, limit=DEFAULT_LIMIT):
+    """
+    Phone-looking terms use prefix matches on the phone columns, everything else
+    matches the folded name. On Postgres the name match is served by a trigram
+    index and ranked by similarity; other backends rank prefix matches first.
+    """
+    value = value.strip()
+    if value.isdigit():
+        return queryset.filter(
+            Q(contact_phone__startswith=value) | Q(additional_phone__startswith=value)
+        ).order_by("contact_phone", "id")[:limit]
+
+    term = normalize_arabic(value)
+    queryset = queryset.filter(search_name__contains=term).annotate(
+        starts_with=Case(
+            When(search_name__startswith=term, then=Value(0)),
+            default=Value(1),
+            output_field=IntegerField(),
+        ),
+    )
+    ordering = ["starts_with", Length("search_name").asc(), "id"]
+    if connection.vendor == "postgresql":
+        from django.contrib.postgres.search import TrigramSimilarity
+
+        queryset = queryset.annotate(rank=TrigramSimilarity("search_name", Value(term, output_field=CharField())))
+        ordering.insert(0, "-rank")
+    return queryset.order_by(*ordering)[:limit]
+
+
+def parse_limit(raw):
+    try:
+        limit = int(raw)
+    except (TypeError, ValueError):
+        return DEFAULT_LIMIT
+    return max(1, min(limit, MAX_LIMIT))
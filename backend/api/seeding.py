@@ -0,0 +1,80 @@
+import random
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.db import connection
+
+from .counters import rebuild_counters
+from .models import DailyFollowUp, Grade, MonthlyPayment, PaymentMonth, Quiz, Student
+
+SEED_BATCH_SIZE = 2000
+FIRST_NAMES = ["أحمد", "محمد", "فاطمة", "مريم", "يوسف", "علي", "نور", "سارة", "عمر", "هدى"]
+LAST_NAMES = ["حسن", "إبراهيم", "مصطفى", "سعيد", "عبدالله", "خالد", "رمضان", "فؤاد"]
+
+
+def _batched(model, objects):
+    batch = []
+    for obj in objects:
+        batch.append(obj)
+        if len(batch) >= SEED_BATCH_SIZE:
+            model.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        model.objects.bulk_create(batch)
+
+
+def seed(grades=5, students_per_grade=100, months=10, days=60, absence_rate=0.1, seed_value=0, prefix="bench"):
+    """
+    Bulk-insert a synthetic school: grades, students, payment months and, for every
+    student, ``days`` daily follow-ups plus a payment and a quiz per month.
+    Returns the created grades.
+    """
+    rng = random.Random(seed_value)
+    grade_objects = Grade.objects.bulk_create([
+        Grade(level=f"{prefix} {index + 1}") for index in range(grades)
+    ])
+    start_order = (PaymentMonth.objects.order_by("-order").values_list("order", flat=True).first() or 0) + 1
+    PaymentMonth.objects.bulk_create([
+        PaymentMonth(name=f"{prefix} شهر {index + 1}", order=start_order + index) for index in range(months)
+    ])
+    month_objects = list(PaymentMonth.objects.filter(order__gte=start_order))
+
+    for grade in grade_objects:
+        Student.objects.bulk_create([
+            Student(
+                name=f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {prefix}-{grade.id}-{index}",
+                grade=grade,
+                contact_phone=f"01{rng.randrange(10 ** 9):09d}",
+            )
+            for index in range(students_per_grade)
+        ], batch_size=SEED_BATCH_SIZE)
+
+    students = Student.objects.filter(grade__in=grade_objects).values_list("id", flat=True)
+    first_day = date.today() - timedelta(days=days)
+    _batched(DailyFollowUp, (
+        DailyFollowUp(
+            student_id=student_id,
+            date=first_day + timedelta(days=day),
+            is_absent=rng.random() < absence_rate,
+            degree=Decimal(rng.randrange(0, 2001)) / 100,
+        )
+        for student_id in students.iterator()
+        for day in range(days)
+    ))
+    _batched(MonthlyPayment, (
+        MonthlyPayment(student_id=student_id, month=month, is_paid=rng.random() < 0.7)
+        for student_id in students.iterator()
+        for month in month_objects
+    ))
+    _batched(Quiz, (
+        Quiz(student_id=student_id, month=month, notes=rng.choice([None, "", "ممتاز", "محتاج متابعة"]))
+        for student_id in students.iterator()
+        for month in month_objects
+    ))
+
+    rebuild_counters(students)
+
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+    return grade_objects
@@ -1,6 +1,9 @@
+from decimal import Decimal
+
+from django.db import models
+from django.utils import timezone
 from rest_framework import serializers
-from .models import *
-from django.contrib.auth.models import User
+from .models import DailyFollowUp, Grade, Job, MonthlyPayment, PaymentMonth, Quiz, Student
 
 class GradeSerializer(serializers.ModelSerializer):
     class Meta:
@@ -30,7 +33,9 @@ class StudentSerializer(serializers.ModelSerializer):
     )
     class Meta:
         model = Student
-        fields = ['id', 'name', 'grade', 'contact_phone', 'additional_phone', 'initial_level', 'notes', 'created_at']
+        fields = ['id', 'name', 'grade', 'contact_phone', 'additional_phone', 'initial_level', 'notes', 'created_at',
+                  'absence_count', 'unpaid_months', 'latest_degree']
+        read_only_fields = ['absence_count', 'unpaid_months', 'latest_degree']
         extra_kwargs = {
             'name': {
                 'required': True,
@@ -82,14 +87,43 @@ class StudentSerializer(serializers.ModelSerializer):
     
     def to_representation(self, instance):
         rep = super().to_representation(instance)
-        rep['grade'] = GradeSerializer(instance.grade).data
+        # list views share this serializer across rows, so each grade is serialized once per request
+        grades = self.__dict__.setdefault('_grade_cache', {})
+        if instance.grade_id not in grades:
+            grades[instance.grade_id] = GradeSerializer(instance.grade).data
+        rep['grade'] = grades[instance.grade_id]
         return rep
         
+class StudentImportSerializer(StudentSerializer):
+    """
+    One row of a bulk import. Grades resolve against ``context['grades']`` (by id or
+    level) and name collisions are checked for the whole file by the import view,
+    so validating a row never touches the database.
+    """
+    grade = serializers.CharField(
+        error_messages={
+            "required": "لازم تختار الصف الدراسي للطالب",
+            "blank": "مينفعش تسيب الصف الدراسي للطالب فاضي",
+            "null": "لازم تختار الصف الدراسي للطالب",
+        }
+    )
+
+    def validate_name(self, value):
+        return value
+
+    def validate_grade(self, value):
+        grade = self.context['grades'].get(value.strip())
+        if grade is None:
+            raise serializers.ValidationError("الصف الدراسي مش موجود")
+        return grade
+
+
 class DailyFollowUpSerializer(serializers.ModelSerializer):
+    student_id = serializers.ReadOnlyField()
     name = serializers.ReadOnlyField(source='student.name')
     class Meta:
         model = DailyFollowUp
-        fields = ['id', 'name', 'date', 'is_absent', 'degree', 'notes', 'created_at', 'updated_at']
+        fields = ['id', 'student_id', 'name', 'date', 'is_absent', 'degree', 'notes', 'created_at', 'updated_at']
         
 
 class PaymentMonthSerializer(serializers.ModelSerializer):
@@ -126,9 +160,9 @@ class MonthlyPaymentSerializer(serializers.ModelSerializer):
         
 
 class QuizSerializer(serializers.ModelSerializer):
-    student_id = serializers.ReadOnlyField(source='student.id')
+    student_id = serializers.ReadOnlyField()
     student = serializers.ReadOnlyField(source='student.name')
-    month_id = serializers.ReadOnlyField(source='month.id')
+    month_id = serializers.ReadOnlyField()
     month_name = serializers.ReadOnlyField(source='month.name')
 
     class Meta:
@@ -153,10 +187,125 @@ class StudentFullSerializer(serializers.ModelSerializer):
     followups = serializers.SerializerMethodField()
     payments = CustomMonthlyPaymentSerializer(many=True, read_only=True)
     quizzes = CustomQuizSerializer(many=True, read_only=True)
+    summary = serializers.SerializerMethodField()
     class Meta:
         model = Student
-        fields = "__all__"
+        exclude = ["search_name"]
         
     def get_followups(self, obj):
-        qs = DailyFollowUp.objects.filter(student=obj, is_absent=True)
-        return CustomDailyFollowUpSerializer(qs, many=True).data
\ No newline at end of file
+        # StudentListAllData prefetches the absences into `absences`
+        qs = getattr(obj, 'absences', None)
+        if qs is None:
+            qs = DailyFollowUp.objects.filter(student=obj, is_absent=True)
+        return CustomDailyFollowUpSerializer(qs, many=True).data
+
+    def get_summary(self, obj):
+        # computed by the database as annotations on the profile queryset
+        if not hasattr(obj, 'total_absences'):
+            return None
+        average = obj.average_degree
+        return {
+            'total_followups': obj.total_followups,
+            'total_absences': obj.total_absences,
+            'average_degree': None if average is None else round(float(average), 2),
+            'paid_months': obj.paid_month_count,
+            'unpaid_months': obj.unpaid_month_count,
+        }
+
+class JobSerializer(serializers.ModelSerializer):
+    progress = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = ['id', 'kind', 'status', 'done', 'total', 'progress', 'result', 'error', 'attempts',
+                  'created_at', 'started_at', 'finished_at']
+        read_only_fields = fields
+
+    def get_progress(self, obj):
+        if obj.status == Job.DONE:
+            return 100
+        if not obj.total:
+            return None
+        return min(100, round(obj.done * 100 / obj.total))
+
+
+def _datetime_output(tz):
+    # what serializers.DateTimeField renders with the default ISO 8601 format
+    def convert(value):
+        value = value.astimezone(tz).isoformat() if tz and timezone.is_aware(value) else value.isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+def _decimal_output(field):
+    exponent = Decimal(1).scaleb(-field.decimal_places)
+    return lambda value: format(value.quantize(exponent), 'f')
+
+
+class ValuesSerializer:
+    """
+    Read-only fast path for large listings such as the grids: rows come from
+    ``queryset.values_list()`` and become plain dicts with the same output as
+    the ModelSerializer they stand in for, without building model instances
+    or running per-field serializer code. ``fields`` maps each output key to
+    an ORM lookup; decimals, dates and datetimes are formatted like DRF does.
+    """
+    model = None
+    fields = {}
+
+    def _field(self, lookup):
+        model = self.model
+        *path, name = lookup.split('__')
+        for part in path:
+            model = model._meta.get_field(part).related_model
+        return model._meta.get_field(name)
+
+    def _converters(self):
+        tz = timezone.get_current_timezone()
+        converters = []
+        for index, lookup in enumerate(self.fields.values()):
+            field = self._field(lookup)
+            if isinstance(field, models.DecimalField):
+                converters.append((index, _decimal_output(field)))
+            elif isinstance(field, models.DateTimeField):
+                converters.append((index, _datetime_output(tz)))
+            elif isinstance(field, models.DateField):
+                converters.append((index, lambda value: value.isoformat()))
+        return converters
+
+    def values(self, queryset):
+        return queryset.values_list(*self.fields.values())
+
+    def to_rows(self, values):
+        keys = tuple(self.fields)
+        converters = self._converters()
+        rows = []
+        for value in values:
+            if converters:
+                value = list(value)
+                for index, convert in converters:
+                    if value[index] is not None:
+                        value[index] = convert(value[index])
+            rows.append(dict(zip(keys, value)))
+        return rows
+
+    def rows(self, queryset):
+        return self.to_rows(self.values(queryset))
+
+
+class DailyFollowUpValuesSerializer(ValuesSerializer):
+    """Same rows as DailyFollowUpSerializer."""
+    model = DailyFollowUp
+    fields = {
+        'id': 'id', 'student_id': 'student_id', 'name': 'student__name', 'date': 'date', 'is_absent': 'is_absent',
+        'degree': 'degree', 'notes': 'notes', 'created_at': 'created_at', 'updated_at': 'updated_at',
+    }
+
+
+class QuizValuesSerializer(ValuesSerializer):
+    """Same rows as QuizSerializer."""
+    model = Quiz
+    fields = {
+        'id': 'id', 'student_id': 'student_id', 'student': 'student__name', 'month_id': 'month_id',
+        'month_name': 'month__name', 'notes': 'notes', 'created_at': 'created_at', 'updated_at': 'updated_at',
+    }
@@ -0,0 +1,151 @@
+from django.db.models import DEFERRED, Count, Model, QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .cache import bump_all_grades, bump_grades
+from .counters import apply_deltas, rebuild_counters, refresh_latest_degree
+from .deletion import tombstone_month_rows, tombstone_student_rows
+from .models import DailyFollowUp, Grade, MonthlyPayment, PaymentMonth, Quiz, Student, Tombstone
+
+
+@receiver([post_save, post_delete], sender=Grade)
+def grade_changed(sender, instance, **kwargs):
+    bump_grades(instance.pk)
+
+
+@receiver(pre_save, sender=Student)
+def student_moving(sender, instance, **kwargs):
+    if instance.pk:
+        instance._previous_grade_id = (
+            Student.objects.filter(pk=instance.pk).values_list("grade_id", flat=True).first()
+        )
+
+
+@receiver([post_save, post_delete], sender=Student)
+def student_changed(sender, instance, **kwargs):
+    bump_grades(instance.grade_id, getattr(instance, "_previous_grade_id", None))
+
+
+def _origin_model(origin):
+    """The model a delete started at; ``origin`` is the instance or queryset ``delete()`` was called on."""
+    return origin.model if isinstance(origin, QuerySet) else type(origin)
+
+
+def _cascade_from_student(origin):
+    """Whether a delete started at a student or grade, taking its grid rows with it."""
+    return _origin_model(origin) in (Student, Grade)
+
+
+def _cascade_root(origin, model):
+    """
+    The pks deleted at ``origin`` when it is a ``model`` instance or queryset, the
+    first time this is asked for that delete; pre_delete fires once per instance.
+    """
+    if _origin_model(origin) is not model or getattr(origin, "_cascade_handled", False):
+        return None
+    origin._cascade_handled = True
+    return [origin.pk] if isinstance(origin, Model) else list(origin.values_list("pk", flat=True))
+
+
+# Rows deleted along with a student or month are tombstoned once, at the root of the
+# cascade, rather than one per row in grid_row_changed. A deleted grade takes its
+# grids with it and needs none (like api.deletion.delete_grades).
+
+@receiver(pre_delete, sender=Student)
+def student_rows_deleting(sender, instance, origin=None, **kwargs):
+    student_ids = _cascade_root(origin, Student)
+    if student_ids:
+        tombstone_student_rows(student_ids)
+
+
+@receiver(pre_delete, sender=PaymentMonth)
+def month_rows_deleting(sender, instance, origin=None, **kwargs):
+    month_ids = _cascade_root(origin, PaymentMonth)
+    if month_ids:
+        tombstone_month_rows(month_ids)
+        # one grouped UPDATE instead of payment_deleted_counters per cascaded payment
+        unpaid = (
+            MonthlyPayment.objects.filter(month_id__in=month_ids, is_paid=False)
+            .values("student_id").annotate(count=Count("id")).order_by()
+        )
+        apply_deltas("unpaid_months", {row["student_id"]: -row["count"] for row in unpaid})
+
+
+@receiver([post_save, post_delete], sender=PaymentMonth)
+def month_changed(sender, instance, **kwargs):
+    bump_all_grades()
+
+
+def _grade_of(instance):
+    # use the loaded student when there is one; a cascade may already have removed it
+    student = instance._state.fields_cache.get("student")
+    if student is not None:
+        return student.grade_id
+    return Student.objects.filter(pk=instance.student_id).values_list("grade_id", flat=True).first()
+
+
+@receiver([post_save, post_delete], sender=DailyFollowUp)
+@receiver([post_save, post_delete], sender=MonthlyPayment)
+@receiver([post_save, post_delete], sender=Quiz)
+def grid_row_changed(sender, instance, **kwargs):
+    if _origin_model(kwargs.get("origin")) in (Student, Grade, PaymentMonth):
+        return  # tombstoned at the root above; the student's, grade's or month's own signal bumps the grids
+    grade_id = _grade_of(instance)
+    if grade_id is None:
+        bump_all_grades()
+    else:
+        bump_grades(grade_id)
+
+    if kwargs["signal"] is post_delete:
+        Tombstone.objects.create(model=sender._meta.model_name, object_id=instance.pk, grade_id=grade_id)
+
+
+def _loaded(instance, *fields):
+    """Field values as last read from the database, or None if unknown."""
+    loaded = getattr(instance, "_loaded_values", None)
+    if loaded is None or any(field not in loaded or loaded[field] is DEFERRED for field in fields):
+        return None
+    return loaded
+
+
+def _remember(instance, *fields):
+    instance._loaded_values = {field: getattr(instance, field) for field in fields}
+
+
+@receiver(post_save, sender=DailyFollowUp)
+def followup_counters(sender, instance, created, **kwargs):
+    fields = ("is_absent", "degree", "date")
+    before = {"is_absent": False, "degree": None, "date": None} if created else _loaded(instance, *fields)
+    if before is None:
+        rebuild_counters([instance.student_id])
+    else:
+        apply_deltas("absence_count", {instance.student_id: int(instance.is_absent) - int(before["is_absent"])})
+        if (before["degree"], before["date"]) != (instance.degree, instance.date):
+            refresh_latest_degree([instance.student_id])
+    _remember(instance, *fields)
+
+
+@receiver(post_save, sender=MonthlyPayment)
+def payment_counters(sender, instance, created, **kwargs):
+    before = {"is_paid": True} if created else _loaded(instance, "is_paid")
+    if before is None:
+        rebuild_counters([instance.student_id])
+    else:
+        apply_deltas("unpaid_months", {instance.student_id: int(before["is_paid"]) - int(instance.is_paid)})
+    _remember(instance, "is_paid")
+
+
+@receiver(post_delete, sender=DailyFollowUp)
+def followup_deleted_counters(sender, instance, origin=None, **kwargs):
+    if _cascade_from_student(origin):
+        return  # the student and its counters are going too
+    apply_deltas("absence_count", {instance.student_id: -int(instance.is_absent)})
+    if instance.degree is not None:
+        refresh_latest_degree([instance.student_id])
+
+
+@receiver(post_delete, sender=MonthlyPayment)
+def payment_deleted_counters(sender, instance, origin=None, **kwargs):
+    if _origin_model(origin) in (Student, Grade, PaymentMonth):
+        return  # the student is going too, or month_rows_deleting already counted it
+    apply_deltas("unpaid_months", {instance.student_id: -int(not instance.is_paid)})
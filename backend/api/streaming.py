@@ -0,0 +1,62 @@
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+STREAM_CHUNK_SIZE = 500
+
+
+def wants_stream(request):
+    return request.query_params.get("stream") in ("1", "true")
+
+
+def iter_json_array(serializer, queryset, chunk_size=STREAM_CHUNK_SIZE, prefix="", suffix=""):
+    """
+    Yield ``prefix [row, row, ...] suffix`` one chunk at a time, reading the
+    queryset with a server-side cursor so memory stays flat.
+    """
+    encoder = JSONEncoder(ensure_ascii=False)
+    yield prefix + "["
+    buffer = []
+    first = True
+    for instance in queryset.iterator(chunk_size=chunk_size):
+        buffer.append(encoder.encode(serializer.to_representation(instance)))
+        if len(buffer) >= chunk_size:
+            yield ("" if first else ",") + ",".join(buffer)
+            buffer, first = [], False
+    if buffer:
+        yield ("" if first else ",") + ",".join(buffer)
+    yield "]" + suffix
+
+
+def streaming_json_response(serializer, queryset, chunk_size=STREAM_CHUNK_SIZE, prefix="", suffix=""):
+    return StreamingHttpResponse(
+        iter_json_array(serializer, queryset, chunk_size, prefix, suffix),
+        content_type="application/json",
+    )
+
+
+def json_fragment(value):
+    return json.dumps(value, cls=JSONEncoder, ensure_ascii=False)
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def streaming_csv_response(header, rows, filename):
+    """
+    Stream ``rows`` as CSV. The UTF-8 BOM makes Excel open Arabic text correctly.
+    """
+    writer = csv.writer(_Echo())
+
+    def lines():
+        yield "\ufeff" + writer.writerow(header)
+        for row in rows:
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(lines(), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
@@ -5,6 +5,7 @@ urlpatterns = [
     path('grades/',views.GradeListCreateView.as_view() ,name='grade-list-create'), 
     path('grades/<int:pk>/',views.GradeRetrieveUpdateDestroyView.as_view() ,name='grade-edit-delete'),
     path('students/',views.StudentListCreateView.as_view() ,name='student-list-create'),
+    path('students/import/',views.StudentImportView.as_view() ,name='student-import'),
     path('students/all/delete/',views.StudentBulkDeleteView.as_view() ,name='student-delete-all'),
     path('students/<int:pk>/',views.StudentRetrieveUpdateDestroyView.as_view() ,name='student-edit-delete'),
     path('students/<int:pk>/all/',views.StudentListAllData.as_view() ,name='student-all-data'),
@@ -14,5 +15,19 @@ urlpatterns = [
     path('months/',views.PaymentMonthListCreateView.as_view() ,name='month-list-create'),
     path('payments/',views.MonthlyPaymentListCreateView.as_view() ,name='payment-list-create'),
     path('quizzes/',views.QuizListCreateView.as_view() ,name='quiz-list-create'),
+    path('async/daily-followups/',views.AsyncDailyFollowUpView.as_view() ,name='async-followups'),
+    path('async/payments/',views.AsyncMonthlyPaymentView.as_view() ,name='async-payments'),
+    path('async/quizzes/',views.AsyncQuizView.as_view() ,name='async-quizzes'),
+    path('async/students/search/<str:value>',views.AsyncStudentSearchView.as_view() ,name='async-search-student'),
+    path('analytics/',views.GradeAnalyticsView.as_view() ,name='grade-analytics'),
+    path('request-stats/',views.RequestStatsView.as_view() ,name='request-stats'),
+    path('grid-cache/stats/',views.GridCacheStatsView.as_view() ,name='grid-cache-stats'),
+    path('export/students/',views.CsvExportView.as_view(sheet='students') ,name='export-students'),
+    path('export/daily-followups/',views.CsvExportView.as_view(sheet='followups') ,name='export-followups'),
+    path('export/payments/',views.CsvExportView.as_view(sheet='payments') ,name='export-payments'),
+    path('export/quizzes/',views.CsvExportView.as_view(sheet='quizzes') ,name='export-quizzes'),
+    path('jobs/',views.JobListView.as_view() ,name='job-list'),
+    path('jobs/<int:pk>/',views.JobDetailView.as_view() ,name='job-detail'),
+    path('jobs/<int:pk>/download/',views.JobDownloadView.as_view() ,name='job-download'),
     path("delete-all/", views.DeleteAllDataExceptGradesAndStudentsView.as_view(), name="delete-all"),
 ]
\ No newline at end of file
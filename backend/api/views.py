@@ -1,15 +1,41 @@
-from django.shortcuts import render, get_object_or_404
-from .models import *
-from .serializers import *
+from django.shortcuts import get_object_or_404
+from .models import DailyFollowUp, Grade, Job, JobOutput, MonthlyPayment, PaymentMonth, Quiz, Student, TermArchive, Tombstone
+from .serializers import (
+    DailyFollowUpSerializer, DailyFollowUpValuesSerializer, GradeSerializer, JobSerializer, MonthlyPaymentSerializer,
+    PaymentMonthSerializer, QuizSerializer, QuizValuesSerializer, StudentFullSerializer, StudentSerializer,
+)
+from .analytics import grade_analytics
+from .cache import acached_grid, bump_all_grades, bump_grades, cached_grid, stats as grid_cache_stats
+from .counters import apply_deltas, per_student, refresh_latest_degree, refresh_unpaid_months
+from .deletion import delete_grades, delete_students
+from .exports import sheet_rows
+from .instrumentation import route_stats
+from .search import parse_limit, search_students
+from .pagination import StudentKeysetPagination
+from .renderers import dumps
+from .streaming import json_fragment, streaming_csv_response, streaming_json_response, wants_stream
 from rest_framework.permissions import AllowAny
 from rest_framework import generics
 from rest_framework.response import Response
 from rest_framework import status
-from django.db.models import Q
-from django.utils.dateparse import parse_date
-from datetime import date as date_cls
+from django.conf import settings
+from django.db import DatabaseError, IntegrityError, transaction
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.views import View
+from asgiref.sync import sync_to_async
+from django.urls import reverse
+from django.db.models import Avg, Count, Prefetch, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from collections import defaultdict
+from datetime import date as date_cls, timedelta
+from rest_framework.exceptions import ValidationError
 from rest_framework.views import APIView
-import json
+import asyncio
+import logging
+
+logger = logging.getLogger("api.views")
 
 class GradeListCreateView(generics.ListCreateAPIView):
     queryset = Grade.objects.all()
@@ -20,16 +46,56 @@ class GradeRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Grade.objects.all()
     serializer_class = GradeSerializer
     permission_classes = [AllowAny]
+
+    def perform_destroy(self, instance):
+        delete_grades(Grade.objects.filter(pk=instance.pk))
     
+STUDENT_ORDERING_FIELDS = {"name", "created_at", "absence_count", "unpaid_months", "latest_degree"}
+STUDENT_ORDERINGS = STUDENT_ORDERING_FIELDS | {f"-{field}" for field in STUDENT_ORDERING_FIELDS}
+
+
+def _filter_students(queryset, params):
+    """
+    ``?min_absences=``, ``?has_unpaid=1`` and ``?ordering=[-]field`` over the counter
+    columns. Keyset pages keep their own (grade_id, id) order.
+    """
+    min_absences = _as_pk(params.get("min_absences"))
+    if min_absences:
+        queryset = queryset.filter(absence_count__gte=min_absences)
+    if params.get("has_unpaid") in ("1", "true"):
+        queryset = queryset.filter(unpaid_months__gt=0)
+    ordering = params.get("ordering")
+    if ordering:
+        if ordering not in STUDENT_ORDERINGS:
+            raise ValidationError({"ordering": [f"Choose one of: {', '.join(sorted(STUDENT_ORDERINGS))}"]})
+        queryset = queryset.order_by(ordering, "id")
+    return queryset
+
+
 class StudentListCreateView(generics.ListCreateAPIView):
-    queryset = Student.objects.all()
+    queryset = Student.objects.select_related("grade")
     serializer_class = StudentSerializer
     permission_classes = [AllowAny]
+    pagination_class = StudentKeysetPagination
+
+    def get_queryset(self):
+        return _filter_students(super().get_queryset(), self.request.query_params)
+
+    def list(self, request, *args, **kwargs):
+        if wants_stream(request):
+            queryset = self.get_queryset()
+            if not queryset.query.order_by:
+                queryset = queryset.order_by(*self.paginator.ordering)
+            return streaming_json_response(self.get_serializer(), queryset)
+        return super().list(request, *args, **kwargs)
     
 class StudentRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = Student.objects.all()
+    queryset = Student.objects.select_related("grade")
     serializer_class = StudentSerializer
     permission_classes = [AllowAny]
+
+    def perform_destroy(self, instance):
+        delete_students(Student.objects.filter(pk=instance.pk))
     
 class StudentBulkDeleteView(APIView):
     permission_classes = [AllowAny]
@@ -39,44 +105,179 @@ class StudentBulkDeleteView(APIView):
         if not ids:
             return Response({"detail": "No IDs provided."}, status=status.HTTP_400_BAD_REQUEST)
 
-        deleted_count, _ = Student.objects.filter(id__in=ids).delete()
+        if _wants_job(request):
+            return _queue_job("delete_students", ids=ids)
+
+        deleted_count = delete_students(Student.objects.filter(id__in=ids))
 
         return Response(
             {"detail": f"Deleted {deleted_count} students."},
             status=status.HTTP_200_OK,
         )
     
+class StudentImportView(APIView):
+    """
+    POST a CSV/JSON file as ``file`` or a JSON list of students. ``?dry_run=1``
+    validates without saving.
+    """
+    permission_classes = [AllowAny]
+
+    def post(self, request, *args, **kwargs):
+        from .importing import ImportFormatError, import_students, read_rows
+
+        dry_run = request.query_params.get("dry_run") in ("1", "true")
+        try:
+            first_line, rows = read_rows(request.FILES.get("file"), request.data)
+        except ImportFormatError as exc:
+            return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+
+        if _wants_job(request):
+            return _queue_job("import_students", rows=rows, first_line=first_line, dry_run=dry_run)
+
+        created, errors = import_students(rows, first_line=first_line, dry_run=dry_run)
+        if created and not dry_run:
+            bump_all_grades()
+        if errors:
+            return Response({"dry_run": dry_run, "created": 0, "errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            {"dry_run": dry_run, "created": created, "errors": []},
+            status=status.HTTP_200_OK if dry_run else status.HTTP_201_CREATED,
+        )
+    
 class StudentSearchView(generics.ListAPIView):
     serializer_class = StudentSerializer
     permission_classes = [AllowAny]
-    queryset = Student.objects.all()
+    queryset = Student.objects.select_related("grade")
     
-    def get(self, _request, *args, **kwargs):
+    def get(self, request, *args, **kwargs):
         value = kwargs['value']
-        value = value.strip()
-        queryset = self.queryset.filter(
-            Q(name__icontains=value)
-            | Q(contact_phone__icontains=value)
-        )
+        queryset = search_students(self.queryset, value, limit=parse_limit(request.query_params.get("limit")))
         serializer = self.serializer_class(queryset, many=True)
         return Response(serializer.data)
     
 class StudentByGradeView(generics.ListAPIView):
     serializer_class = StudentSerializer
     permission_classes = [AllowAny]
-    queryset = Student.objects.all()
+    queryset = Student.objects.select_related("grade")
+    
+    pagination_class = StudentKeysetPagination
     
-    def get(self, _request, *args, **kwargs):
+    def get(self, request, *args, **kwargs):
         grade = kwargs['id']
         grade = get_object_or_404(Grade, id=grade)
-        queryset = self.queryset.filter(grade=grade)
-        serializer = self.serializer_class(queryset, many=True)
-        
-        return Response({"students": {
+        queryset = _filter_students(self.queryset.filter(grade=grade), request.query_params)
+
+        if wants_stream(request):
+            return streaming_json_response(
+                self.get_serializer(),
+                queryset if queryset.query.order_by else queryset.order_by(*self.paginator.ordering),
+                prefix=f'{{"students": {{"grade": {json_fragment(grade.level)}, "data": ',
+                suffix="}}",
+            )
+
+        page = self.paginate_queryset(queryset)
+        students = {
             "grade": grade.level,
-            "data": serializer.data
-        }}) 
+            "data": self.get_serializer(page if page is not None else queryset, many=True).data,
+        }
+        if page is not None:
+            students["next"] = self.paginator.get_next_link()
+        return Response({"students": students})
     
+def _parse_since(request):
+    """Return the ``?since=`` timestamp as an aware datetime, None when absent, or raise ValueError."""
+    raw = request.GET.get("since")
+    if not raw:
+        return None
+    since = parse_datetime(raw.replace(" ", "+"))
+    if since is None:
+        raise ValueError(raw)
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def _delta(queryset, model, grade_id, since, serialize):
+    """
+    Rows of ``queryset`` changed after ``since`` plus ids deleted since then, and
+    the high-water mark to send as the next ``since``.
+
+    ``updated_at`` is stamped before the write commits, so a slow transaction
+    can commit a row older than rows already returned. The mark therefore
+    trails the read time by ``DELTA_SYNC_OVERLAP_SECONDS``; rows inside that
+    window come back again on the next sync, and clients apply them idempotently.
+
+    A term rollover after ``since`` clears rows without tombstones, so the
+    client is told to ``reset`` and refetch the full grid instead.
+    """
+    read_at = timezone.now()
+    rollover = TermArchive.objects.filter(created_at__gt=since).values_list("created_at", flat=True).first()
+    if rollover:
+        return {"since": since, "high_water_mark": rollover, "reset": True, "changed": [], "deleted": []}
+    changed = list(queryset.filter(updated_at__gt=since).order_by("updated_at", "id"))
+    deleted = list(
+        Tombstone.objects.filter(model=model._meta.model_name, grade_id=grade_id, deleted_at__gt=since)
+        .values_list("object_id", "deleted_at")
+    )
+    marks = [row.updated_at for row in changed] + [deleted_at for _, deleted_at in deleted]
+    settled = read_at - timedelta(seconds=settings.DELTA_SYNC_OVERLAP_SECONDS)
+    return {
+        "since": since,
+        "high_water_mark": max(since, min(max(marks, default=since), settled)),
+        "changed": serialize(changed),
+        "deleted": [object_id for object_id, _ in deleted],
+    }
+
+
+def _wants_job(request):
+    return request.query_params.get("async") in ("1", "true")
+
+
+def _queue_job(kind, **params):
+    """Queue a ``kind`` job and answer 202 with it; poll ``jobs/<id>/`` for progress."""
+    # imported on first use: the job handlers pull in the rollover, import and
+    # export code, which most cold starts never need
+    from .jobs import enqueue
+
+    job = enqueue(kind, **params)
+    return Response(
+        {**JobSerializer(job).data, "url": reverse("job-detail", args=[job.pk])},
+        status=status.HTTP_202_ACCEPTED,
+    )
+
+
+def _virtual_followup(student, date):
+    """An unsaved roll-call row with the same shape as DailyFollowUpSerializer output."""
+    return {
+        "id": None,
+        "student_id": student.id,
+        "name": student.name,
+        "date": date.isoformat(),
+        "is_absent": False,
+        "degree": None,
+        "notes": "",
+        "created_at": None,
+        "updated_at": None,
+    }
+
+
+def _optional_date(value):
+    """``value`` as a date, None when empty; ValueError when it isn't a real date (2025-13-01 too)."""
+    if not value:
+        return None
+    parsed = parse_date(value)
+    if parsed is None:
+        raise ValueError(value)
+    return parsed
+
+
+def _as_pk(value):
+    try:
+        return int(value) if value not in (None, "") else None
+    except (TypeError, ValueError):
+        return None
+
+
 class DailyFollowUpListCreateView(generics.GenericAPIView):
     serializer_class = DailyFollowUpSerializer
     permission_classes = [AllowAny]
@@ -91,42 +292,149 @@ class DailyFollowUpListCreateView(generics.GenericAPIView):
         date = parse_date(date_str)
         if not date:
             return Response({"detail": "Invalid date format"}, status=status.HTTP_400_BAD_REQUEST)
+        grade_id = _as_pk(grade_id)
+        if not grade_id:
+            return Response({"detail": "Invalid grade"}, status=status.HTTP_400_BAD_REQUEST)
+        virtual = request.query_params.get("virtual") in ("1", "true")
+
+        try:
+            since = _parse_since(request)
+        except ValueError:
+            return Response({"detail": "Invalid since timestamp"}, status=status.HTTP_400_BAD_REQUEST)
+        if since:
+            followups = DailyFollowUp.objects.filter(student__grade_id=grade_id, date=date).select_related("student")
+            return Response(_delta(
+                followups, DailyFollowUp, grade_id, since,
+                lambda rows: self.get_serializer(rows, many=True).data,
+            ))
+
+        rows = cached_grid(
+            "followups", grade_id, f"{date.isoformat()}:{int(virtual)}",
+            lambda: self.build_sheet(grade_id, date, virtual),
+        )
+        return Response(rows)
+
+    def build_sheet(self, grade_id, date, virtual):
         today = date_cls.today()
+        students = list(Student.objects.filter(grade_id=grade_id).only("id", "name"))
+        followups = (
+            DailyFollowUp.objects.filter(student__grade_id=grade_id, date=date)
+            .select_related("student")
+            .order_by("student_id")
+        )
 
-        students = Student.objects.filter(grade_id=grade_id)
+        # read-only rows straight from values_list(); same output as the serializer
+        rows = DailyFollowUpValuesSerializer().rows(followups)
+        if date == today and virtual:
+            # roll-call rows are only written once the teacher PATCHes them
+            saved = {row["student_id"]: row for row in rows}
+            return [saved.get(student.id) or _virtual_followup(student, date) for student in students]
 
-        followups = []
         if date == today:
-            for student in students:
-                followup, created = DailyFollowUp.objects.get_or_create(
-                    student=student,
-                    date=date,
-                    defaults={"is_absent": False, "degree": None, "notes": ""}
-                )
-                followups.append(followup)
-        else:
-            followups = DailyFollowUp.objects.filter(student__grade_id=grade_id, date=date)
-
-        serializer = self.get_serializer(followups, many=True)
-        return Response(serializer.data)
+            existing = {row["student_id"] for row in rows}
+            missing = [
+                DailyFollowUp(student=student, date=date, is_absent=False, degree=None, notes="")
+                for student in students
+                if student.id not in existing
+            ]
+            if missing:
+                DailyFollowUp.objects.bulk_create(missing, ignore_conflicts=True)
+                rows = DailyFollowUpValuesSerializer().rows(followups)
+
+        return rows
 
     def patch(self, request, *args, **kwargs):
+        """
+        Each item targets a followup by ``id`` or, for virtual rows, by ``student_id`` + ``date``.
+        The whole list is validated first and saved in one transaction, or not at all.
+        """
         data = request.data
         if not isinstance(data, list):
             return Response({"detail": "Expected a list of followups"}, status=status.HTTP_400_BAD_REQUEST)
 
-        updated = []
-        for item in data:
-            try:
-                followup = DailyFollowUp.objects.get(id=item["id"])
-                serializer = self.get_serializer(followup, data=item, partial=True)
-                serializer.is_valid(raise_exception=True)
-                serializer.save()
-                updated.append(serializer.data)
-            except DailyFollowUp.DoesNotExist:
-                continue
+        serializer = self.get_serializer(data=data, many=True, partial=True)
+        if not serializer.is_valid():
+            errors = [{"index": i, "errors": e} for i, e in enumerate(serializer.errors) if e]
+            return Response({"detail": "Invalid followups", "errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        ids, keys, errors = {}, {}, []
+        for index, (item, values) in enumerate(zip(data, serializer.validated_data)):
+            pk, student_id = _as_pk(item.get("id")), _as_pk(item.get("student_id"))
+            if pk:
+                ids[index] = pk
+            elif student_id and values.get("date"):
+                keys[index] = (student_id, values["date"])
+            else:
+                errors.append({"index": index, "errors": {"id": ["id or student_id and date are required"]}})
+        if errors:
+            return Response({"detail": "Invalid followups", "errors": errors}, status=status.HTTP_400_BAD_REQUEST)
+
+        students, lookup = {}, Q(pk__in=set(ids.values()))
+        if keys:
+            students = Student.objects.only("id", "name", "grade_id").in_bulk({sid for sid, _ in keys.values()})
+            lookup |= Q(student_id__in=students, date__in={d for _, d in keys.values()})
+        # one instance per row, so items naming the same row by id and by student + date both apply
+        targets = {followup.pk: followup for followup in DailyFollowUp.objects.select_related("student").filter(lookup)}
+        existing = {(followup.student_id, followup.date): followup for followup in targets.values()}
+
+        now = timezone.now()
+        changed, created, fields = {}, {}, {"updated_at"}
+        unknown_ids, unknown_students = [], []
+        for index, values in enumerate(serializer.validated_data):
+            if index in ids:
+                followup = targets.get(ids[index])
+                if followup is None:
+                    unknown_ids.append(ids[index])
+                    continue
+            else:
+                student_id, day = keys[index]
+                followup = existing.get((student_id, day))
+                if followup is None:
+                    if student_id not in students:
+                        unknown_students.append(student_id)
+                        continue
+                    followup = DailyFollowUp(student=students[student_id], date=day, is_absent=False, degree=None, notes="")
+                    existing[(student_id, day)] = followup
 
-        return Response(updated, status=status.HTTP_200_OK)
+            for field, value in values.items():
+                setattr(followup, field, value)
+            followup.updated_at = now
+            fields.update(values)
+            if followup.pk is None:
+                created[id(followup)] = followup
+            else:
+                changed[followup.pk] = followup
+
+        absences, degrees = defaultdict(int), set()
+        for followup in [*changed.values(), *created.values()]:
+            before = getattr(followup, "_loaded_values", {"is_absent": False, "degree": None, "date": None})
+            absences[followup.student_id] += int(followup.is_absent) - int(before["is_absent"])
+            if (before["degree"], before["date"]) != (followup.degree, followup.date):
+                degrees.add(followup.student_id)
+
+        try:
+            with transaction.atomic():
+                if changed:
+                    DailyFollowUp.objects.bulk_update(changed.values(), sorted(fields))
+                if created:
+                    DailyFollowUp.objects.bulk_create(created.values())
+                apply_deltas("absence_count", absences)
+                if degrees:
+                    refresh_latest_degree(degrees)
+        except IntegrityError:
+            # another request created one of these (student, date) rows first; nothing was saved
+            return Response(
+                {"detail": "Some followups were created by another request; reload and try again."},
+                status=status.HTTP_409_CONFLICT,
+            )
+        bump_grades(*{followup.student.grade_id for followup in [*changed.values(), *created.values()]})
+
+        updated = self.get_serializer([*changed.values(), *created.values()], many=True).data
+        return Response({
+            "updated": updated,
+            "unknown_ids": unknown_ids,
+            "unknown_students": unknown_students,
+        }, status=status.HTTP_200_OK)
     
     
 class PaymentMonthListCreateView(generics.ListCreateAPIView):
@@ -139,6 +447,69 @@ class PaymentMonthRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIVie
     serializer_class = PaymentMonthSerializer
     permission_classes = [AllowAny]
     
+def _missing_cells(model, existing, students, months, **defaults):
+    return [
+        model(student=student, month=month, **defaults)
+        for student in students
+        for month in months
+        if (student.id, month.id) not in existing
+    ]
+
+
+def _seed_grid(model, existing, students, months, **defaults):
+    """
+    Bulk-insert the (student, month) cells of ``model`` missing from ``existing``.
+    Relies on unique_together (student, month) so concurrent loads can't duplicate rows.
+    """
+    missing = _missing_cells(model, existing, students, months, **defaults)
+    if missing:
+        model.objects.bulk_create(missing, ignore_conflicts=True)
+    return bool(missing)
+
+
+def _payment_cells(grade_id):
+    """Map (student_id, month_id) -> (payment_id, is_paid) for a grade in one query."""
+    rows = MonthlyPayment.objects.filter(student__grade_id=grade_id).values_list(
+        "student_id", "month_id", "id", "is_paid"
+    )
+    return {(student_id, month_id): (pk, is_paid) for student_id, month_id, pk, is_paid in rows}
+
+
+def _payment_grid_rows(students, months, payments):
+    results = []
+    for student in students:
+        student_payments = []
+        for month in months:
+            payment_id, is_paid = payments[(student.id, month.id)]
+            student_payments.append({
+                "month_id": month.id,
+                "month_name": month.name,
+                "is_paid": is_paid,
+                "payment_id": payment_id,
+            })
+
+        results.append({
+            "id": student.id,
+            "name": student.name,
+            "payments": student_payments
+        })
+
+    return results
+
+
+def _payment_delta_cells(payments):
+    return [
+        {
+            "student_id": payment.student_id,
+            "month_id": payment.month_id,
+            "month_name": payment.month.name,
+            "is_paid": payment.is_paid,
+            "payment_id": payment.id,
+        }
+        for payment in payments
+    ]
+
+
 class MonthlyPaymentListCreateView(generics.GenericAPIView):
     serializer_class = MonthlyPaymentSerializer
     permission_classes = [AllowAny]
@@ -147,45 +518,80 @@ class MonthlyPaymentListCreateView(generics.GenericAPIView):
         grade_id = request.query_params.get("grade")
         if not grade_id:
             return Response({"error": "grade_id مطلوب"}, status=status.HTTP_400_BAD_REQUEST)
+        grade_id = _as_pk(grade_id)
+        if not grade_id:
+            return Response({"error": "grade_id غير صحيح"}, status=status.HTTP_400_BAD_REQUEST)
 
-        students = Student.objects.filter(grade_id=grade_id)
-        months = PaymentMonth.objects.all()
-
-        results = []
-        for student in students:
-            student_payments = []
-            for month in months:
-                payment, created = MonthlyPayment.objects.get_or_create(
-                    student=student, month=month,
-                    defaults={"is_paid": False}
-                )
-                student_payments.append({
-                    "month_id": month.id,
-                    "month_name": month.name,
-                    "is_paid": payment.is_paid,
-                    "payment_id": payment.id,
-                })
-
-            results.append({
-                "id": student.id,
-                "name": student.name,
-                "payments": student_payments
-            })
+        try:
+            since = _parse_since(request)
+        except ValueError:
+            return Response({"error": "since غير صحيح"}, status=status.HTTP_400_BAD_REQUEST)
+        if since:
+            payments = MonthlyPayment.objects.filter(student__grade_id=grade_id).select_related("month")
+            return Response(_delta(payments, MonthlyPayment, grade_id, since, _payment_delta_cells))
+
+        return Response(cached_grid("payments", grade_id, "", lambda: self.build_grid(grade_id)))
+
+    def build_grid(self, grade_id):
+        students = list(Student.objects.filter(grade_id=grade_id).only("id", "name"))
+        months = list(PaymentMonth.objects.all())
 
-        return Response(results)
+        payments = _payment_cells(grade_id)
+        if _seed_grid(MonthlyPayment, payments, students, months, is_paid=False):
+            payments = _payment_cells(grade_id)
+            refresh_unpaid_months([student.id for student in students])
+        return _payment_grid_rows(students, months, payments)
 
     def patch(self, request, *args, **kwargs):
+        """
+        Accepts either the changed cells ``[{"payment_id", "is_paid"}]`` or the whole grid
+        the GET returned. Only cells whose stored value differs are written.
+        """
         data = request.data
-        for student in data:
-            for payment in student.get("payments", []):
-                try:
-                    p = MonthlyPayment.objects.get(id=payment["payment_id"])
-                    p.is_paid = payment["is_paid"]
-                    p.save()
-                except MonthlyPayment.DoesNotExist:
+        if not isinstance(data, list):
+            return Response({"detail": "لازم تبعت ليست من الدفعات"}, status=status.HTTP_400_BAD_REQUEST)
+
+        cells = {}
+        for item in data:
+            if not isinstance(item, dict):
+                continue
+            for payment in item.get("payments", [item]):
+                if not isinstance(payment, dict):
                     continue
+                payment_id = _as_pk(payment.get("payment_id"))
+                if payment_id and isinstance(payment.get("is_paid"), bool):
+                    cells[payment_id] = payment["is_paid"]
+
+        paid = [pk for pk, is_paid in cells.items() if is_paid]
+        unpaid = [pk for pk, is_paid in cells.items() if not is_paid]
+        now = timezone.now()
+        with transaction.atomic():
+            # only rows whose stored value differs are selected, locked and written; of=self keeps
+            # the joined Student rows unlocked so profile edits and counter updates do not queue
+            to_paid = list(
+                MonthlyPayment.objects.select_for_update(of=("self",)).filter(id__in=paid, is_paid=False)
+                .values_list("id", "student_id", "student__grade_id")
+            )
+            to_unpaid = list(
+                MonthlyPayment.objects.select_for_update(of=("self",)).filter(id__in=unpaid, is_paid=True)
+                .values_list("id", "student_id", "student__grade_id")
+            )
+            if to_paid:
+                MonthlyPayment.objects.filter(id__in=[row[0] for row in to_paid]).update(is_paid=True, updated_at=now)
+            if to_unpaid:
+                MonthlyPayment.objects.filter(id__in=[row[0] for row in to_unpaid]).update(is_paid=False, updated_at=now)
+
+            unpaid_months = defaultdict(int)
+            for _, student_id, _ in to_paid:
+                unpaid_months[student_id] -= 1
+            for _, student_id, _ in to_unpaid:
+                unpaid_months[student_id] += 1
+            apply_deltas("unpaid_months", unpaid_months)
+
+        updated = len(to_paid) + len(to_unpaid)
+        bump_grades(*{grade_id for _, _, grade_id in [*to_paid, *to_unpaid]})
 
-        return Response({"detail": "تم تحديث الدفعات"}, status=status.HTTP_200_OK)
+        return Response({"detail": "تم تحديث الدفعات", "updated": updated}, status=status.HTTP_200_OK)
     
 class MonthlyPaymentRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     queryset = MonthlyPayment.objects.all()
@@ -202,22 +608,34 @@ class QuizListCreateView(generics.GenericAPIView):
 
         if not grade_id:
             return Response({"detail": "grade مطلوب"}, status=status.HTTP_400_BAD_REQUEST)
+        grade_id = _as_pk(grade_id)
+        if not grade_id:
+            return Response({"detail": "grade غير صحيح"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            since = _parse_since(request)
+        except ValueError:
+            return Response({"detail": "since غير صحيح"}, status=status.HTTP_400_BAD_REQUEST)
+        if since:
+            quizzes = Quiz.objects.filter(student__grade_id=grade_id).select_related("student", "month")
+            return Response(_delta(
+                quizzes, Quiz, grade_id, since,
+                lambda rows: self.get_serializer(rows, many=True).data,
+            ))
 
-        students = Student.objects.filter(grade_id=grade_id)
-        months = PaymentMonth.objects.all()
+        return Response(cached_grid("quizzes", grade_id, "", lambda: self.build_grid(grade_id)), status=status.HTTP_200_OK)
 
-        quizzes = []
-        for student in students:
-            for month in months:
-                quiz, created = Quiz.objects.get_or_create(
-                    student=student,
-                    month=month,
-                    defaults={"notes": None}
-                )
-                quizzes.append(quiz)
+    def build_grid(self, grade_id):
+        students = list(Student.objects.filter(grade_id=grade_id).only("id"))
+        months = list(PaymentMonth.objects.all())
 
-        serializer = self.get_serializer(quizzes, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        existing = set(
+            Quiz.objects.filter(student__grade_id=grade_id).values_list("student_id", "month_id")
+        )
+        _seed_grid(Quiz, existing, students, months, notes=None)
+
+        quizzes = Quiz.objects.filter(student__grade_id=grade_id).order_by("student_id", "month__order", "month_id")
+        return QuizValuesSerializer().rows(quizzes)
 
     def patch(self, request, *args, **kwargs):
         """
@@ -226,15 +644,14 @@ class QuizListCreateView(generics.GenericAPIView):
         if not isinstance(request.data, list):
             return Response({"detail": "لازم تبعت ليست من الكويزات"}, status=status.HTTP_400_BAD_REQUEST)
 
+        # one query for every quiz; the loaded student gives the save signal its grade
+        quizzes = Quiz.objects.select_related("student", "month").in_bulk(
+            {_as_pk(quiz_data.get("id")) for quiz_data in request.data} - {None}
+        )
         updated_quizzes = []
         for quiz_data in request.data:
-            quiz_id = quiz_data.get("id")
-            if not quiz_id:
-                continue
-
-            try:
-                quiz = Quiz.objects.get(id=quiz_id)
-            except Quiz.DoesNotExist:
+            quiz = quizzes.get(_as_pk(quiz_data.get("id")))
+            if quiz is None:
                 continue
 
             serializer = self.get_serializer(quiz, data=quiz_data, partial=True)
@@ -251,19 +668,331 @@ class QuizRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     
 class StudentListAllData(generics.RetrieveAPIView):
     permission_classes = [AllowAny]
-    queryset = Student.objects.all()
+    queryset = (
+        Student.objects.select_related("grade")
+        .prefetch_related(
+            Prefetch(
+                "followups",
+                queryset=DailyFollowUp.objects.filter(is_absent=True).order_by("date"),
+                to_attr="absences",
+            ),
+            Prefetch("payments", queryset=MonthlyPayment.objects.select_related("month").order_by("month__order")),
+            Prefetch("quizzes", queryset=Quiz.objects.select_related("month").order_by("month__order")),
+        )
+        .annotate(
+            total_followups=Coalesce(per_student(DailyFollowUp.objects.all(), Count("id")), 0),
+            total_absences=Coalesce(per_student(DailyFollowUp.objects.filter(is_absent=True), Count("id")), 0),
+            average_degree=per_student(DailyFollowUp.objects.filter(degree__isnull=False), Avg("degree")),
+            paid_month_count=Coalesce(per_student(MonthlyPayment.objects.filter(is_paid=True), Count("id")), 0),
+            unpaid_month_count=Coalesce(per_student(MonthlyPayment.objects.filter(is_paid=False), Count("id")), 0),
+        )
+    )
     serializer_class = StudentFullSerializer
     
     
+class GradeAnalyticsView(APIView):
+    """
+    Attendance and degree analytics over ``?from=&to=`` (default: the last 30 days),
+    for one grade with ``?grade=`` or the whole school.
+    """
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        params = request.query_params
+        grade_id = params.get("grade")
+        if grade_id and not _as_pk(grade_id):
+            return Response({"detail": "Invalid grade"}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            date_to = _optional_date(params.get("to")) or date_cls.today()
+            date_from = _optional_date(params.get("from")) or date_to - timedelta(days=30)
+        except ValueError:
+            return Response({"detail": "Invalid date"}, status=status.HTTP_400_BAD_REQUEST)
+        if date_from > date_to:
+            return Response({"detail": "from must be before to"}, status=status.HTTP_400_BAD_REQUEST)
+        bucket = _as_pk(params.get("bucket")) or 5
+
+        return Response(grade_analytics(_as_pk(grade_id), date_from, date_to, bucket=bucket))
+
+
+class RequestStatsView(APIView):
+    """Per-route latency percentiles for this worker; enabled with REQUEST_STATS_ENABLED."""
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        if not settings.REQUEST_STATS_ENABLED:
+            raise Http404
+        return Response(route_stats.summary())
+
+
+class GridCacheStatsView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        return Response(grid_cache_stats())
+
+
+class CsvExportView(APIView):
+    """
+    Streams a sheet as CSV straight from a database cursor. ``?grade=`` limits
+    it to one grade; without it the whole school is exported. ``sheet`` is set
+    per route (see urls.py) and read through ``exports.sheet_rows``, the same
+    code path the ``?async=1`` export job uses.
+    """
+    permission_classes = [AllowAny]
+    sheet = None
+
+    def get(self, request, *args, **kwargs):
+        grade_id = request.query_params.get("grade")
+        if grade_id and not _as_pk(grade_id):
+            return Response({"detail": "Invalid grade"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            dates = {key: _optional_date(request.query_params.get(key)) for key in ("from", "to")}
+        except ValueError:
+            return Response({"detail": "Invalid date"}, status=status.HTTP_400_BAD_REQUEST)
+        if _wants_job(request):
+            return _queue_job(
+                "export", sheet=self.sheet, grade=grade_id,
+                **{key: value.isoformat() for key, value in dates.items() if value},
+            )
+        header, rows = sheet_rows(self.sheet, grade_id, dates["from"], dates["to"])
+        filename = f"{self.sheet}-grade-{grade_id}.csv" if grade_id else f"{self.sheet}.csv"
+        return streaming_csv_response(header, rows, filename)
+
+
 class DeleteAllDataExceptGradesAndStudentsView(APIView):
+    """
+    Term rollover. DELETE (or POST) copies follow-ups, payments, quizzes and
+    months into their archive tables, then clears them with one DELETE per
+    table; GET lists past archives.
+    """
     permission_classes = [AllowAny]
+
+    def get(self, request, *args, **kwargs):
+        return Response(list(TermArchive.objects.values("id", "counts", "created_at")))
+
     def delete(self, request, *args, **kwargs):
-        DailyFollowUp.objects.all().delete()
-        MonthlyPayment.objects.all().delete()
-        Quiz.objects.all().delete()
-        PaymentMonth.objects.all().delete()
+        from .rollover import rollover_term
 
+        if _wants_job(request):
+            return _queue_job("rollover")
+        try:
+            archive = rollover_term()
+        except DatabaseError:
+            # nothing was archived or deleted: the rollover runs in one transaction
+            logger.exception("Term rollover failed")
+            return Response(
+                {"detail": "Archiving the term failed; nothing was deleted."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
         return Response(
-            {"detail": "All data deleted except Grades and Students."},
+            {
+                "detail": "All data deleted except Grades and Students.",
+                "archive": archive.pk,
+                "deleted": archive.counts,
+            },
             status=status.HTTP_200_OK
-        )
\ No newline at end of file
+        )
+
+    post = delete
+
+
+class JobListView(generics.ListAPIView):
+    """Recent background jobs, newest first; ``?status=`` filters."""
+    serializer_class = JobSerializer
+    permission_classes = [AllowAny]
+
+    def get_queryset(self):
+        queryset = Job.objects.defer("params", "checkpoint").order_by("-created_at", "-id")
+        job_status = self.request.query_params.get("status")
+        if job_status:
+            queryset = queryset.filter(status=job_status)
+        return queryset[:100]
+
+
+class JobDetailView(generics.RetrieveAPIView):
+    queryset = Job.objects.defer("params", "checkpoint")
+    serializer_class = JobSerializer
+    permission_classes = [AllowAny]
+
+
+class JobDownloadView(APIView):
+    """The file a finished job produced (exports), streamed from its JobOutput chunks."""
+    permission_classes = [AllowAny]
+
+    def get(self, request, pk, *args, **kwargs):
+        job = get_object_or_404(Job, pk=pk)
+        filename = (job.result or {}).get("file") if job.status == Job.DONE else None
+        if not filename:
+            return Response({"detail": "Job has no file to download."}, status=status.HTTP_404_NOT_FOUND)
+        chunks = JobOutput.objects.filter(job=job).order_by("seq").values_list("data", flat=True)
+        if not chunks.exists():
+            return Response({"detail": "The job's file is no longer available."}, status=status.HTTP_410_GONE)
+        response = StreamingHttpResponse(chunks.iterator(chunk_size=1), content_type="text/csv; charset=utf-8")
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+# Async read paths. Under ASGI these don't tie up a worker thread while they
+# wait on the database, and independent lookups are awaited together. They
+# return the same JSON as their synchronous counterparts.
+
+def _json(data, status=200):
+    return HttpResponse(dumps(data), status=status, content_type="application/json")
+
+
+async def _alist(queryset):
+    # ``async for`` fetches the whole result in one thread hop; aiterator() would
+    # hop once per chunk and breaks on values_list() querysets in Django 5.2
+    return [row async for row in queryset]
+
+
+async def _aseed_grid(model, existing, students, months, **defaults):
+    missing = _missing_cells(model, existing, students, months, **defaults)
+    if missing:
+        await model.objects.abulk_create(missing, ignore_conflicts=True)
+    return bool(missing)
+
+
+async def _apayment_cells(grade_id):
+    rows = MonthlyPayment.objects.filter(student__grade_id=grade_id).values_list(
+        "student_id", "month_id", "id", "is_paid"
+    )
+    return {(student_id, month_id): (pk, is_paid) async for student_id, month_id, pk, is_paid in rows}
+
+
+class AsyncDailyFollowUpView(View):
+    async def get(self, request, *args, **kwargs):
+        date_str = request.GET.get("date")
+        grade_id = request.GET.get("grade")
+
+        if not date_str or not grade_id:
+            return _json({"detail": "date and grade are required"}, status.HTTP_400_BAD_REQUEST)
+
+        date = parse_date(date_str)
+        if not date:
+            return _json({"detail": "Invalid date format"}, status.HTTP_400_BAD_REQUEST)
+        grade_id = _as_pk(grade_id)
+        if not grade_id:
+            return _json({"detail": "Invalid grade"}, status.HTTP_400_BAD_REQUEST)
+        virtual = request.GET.get("virtual") in ("1", "true")
+
+        try:
+            since = _parse_since(request)
+        except ValueError:
+            return _json({"detail": "Invalid since timestamp"}, status.HTTP_400_BAD_REQUEST)
+        if since:
+            followups = DailyFollowUp.objects.filter(student__grade_id=grade_id, date=date).select_related("student")
+            return _json(await sync_to_async(_delta)(
+                followups, DailyFollowUp, grade_id, since,
+                lambda rows: DailyFollowUpSerializer(rows, many=True).data,
+            ))
+
+        return _json(await acached_grid(
+            "followups", grade_id, f"{date.isoformat()}:{int(virtual)}",
+            lambda: self.build_sheet(grade_id, date, virtual),
+        ))
+
+    async def build_sheet(self, grade_id, date, virtual):
+        today = date_cls.today()
+        serializer = DailyFollowUpValuesSerializer()
+        followups = serializer.values(
+            DailyFollowUp.objects.filter(student__grade_id=grade_id, date=date).order_by("student_id")
+        )
+        students, saved = await asyncio.gather(
+            _alist(Student.objects.filter(grade_id=grade_id).only("id", "name")),
+            _alist(followups),
+        )
+        rows = serializer.to_rows(saved)
+
+        if date == today and virtual:
+            by_student = {row["student_id"]: row for row in rows}
+            return [by_student.get(student.id) or _virtual_followup(student, date) for student in students]
+
+        if date == today:
+            existing = {row["student_id"] for row in rows}
+            missing = [
+                DailyFollowUp(student=student, date=date, is_absent=False, degree=None, notes="")
+                for student in students
+                if student.id not in existing
+            ]
+            if missing:
+                await DailyFollowUp.objects.abulk_create(missing, ignore_conflicts=True)
+                rows = serializer.to_rows(await _alist(followups.all()))
+
+        return rows
+
+
+class AsyncMonthlyPaymentView(View):
+    async def get(self, request, *args, **kwargs):
+        grade_id = request.GET.get("grade")
+        if not grade_id:
+            return _json({"error": "grade_id مطلوب"}, status.HTTP_400_BAD_REQUEST)
+        grade_id = _as_pk(grade_id)
+        if not grade_id:
+            return _json({"error": "grade_id غير صحيح"}, status.HTTP_400_BAD_REQUEST)
+
+        try:
+            since = _parse_since(request)
+        except ValueError:
+            return _json({"error": "since غير صحيح"}, status.HTTP_400_BAD_REQUEST)
+        if since:
+            payments = MonthlyPayment.objects.filter(student__grade_id=grade_id).select_related("month")
+            return _json(await sync_to_async(_delta)(payments, MonthlyPayment, grade_id, since, _payment_delta_cells))
+
+        return _json(await acached_grid("payments", grade_id, "", lambda: self.build_grid(grade_id)))
+
+    async def build_grid(self, grade_id):
+        students, months, payments = await asyncio.gather(
+            _alist(Student.objects.filter(grade_id=grade_id).only("id", "name")),
+            _alist(PaymentMonth.objects.all()),
+            _apayment_cells(grade_id),
+        )
+        if await _aseed_grid(MonthlyPayment, payments, students, months, is_paid=False):
+            payments = await _apayment_cells(grade_id)
+            await sync_to_async(refresh_unpaid_months)([student.id for student in students])
+        return _payment_grid_rows(students, months, payments)
+
+
+class AsyncQuizView(View):
+    async def get(self, request, *args, **kwargs):
+        grade_id = request.GET.get("grade")
+
+        if not grade_id:
+            return _json({"detail": "grade مطلوب"}, status.HTTP_400_BAD_REQUEST)
+        grade_id = _as_pk(grade_id)
+        if not grade_id:
+            return _json({"detail": "grade غير صحيح"}, status.HTTP_400_BAD_REQUEST)
+
+        try:
+            since = _parse_since(request)
+        except ValueError:
+            return _json({"detail": "since غير صحيح"}, status.HTTP_400_BAD_REQUEST)
+        if since:
+            quizzes = Quiz.objects.filter(student__grade_id=grade_id).select_related("student", "month")
+            return _json(await sync_to_async(_delta)(
+                quizzes, Quiz, grade_id, since,
+                lambda rows: QuizSerializer(rows, many=True).data,
+            ))
+
+        return _json(await acached_grid("quizzes", grade_id, "", lambda: self.build_grid(grade_id)))
+
+    async def build_grid(self, grade_id):
+        students, months, existing = await asyncio.gather(
+            _alist(Student.objects.filter(grade_id=grade_id).only("id")),
+            _alist(PaymentMonth.objects.all()),
+            _alist(Quiz.objects.filter(student__grade_id=grade_id).values_list("student_id", "month_id")),
+        )
+        await _aseed_grid(Quiz, set(existing), students, months, notes=None)
+
+        serializer = QuizValuesSerializer()
+        quizzes = Quiz.objects.filter(student__grade_id=grade_id).order_by("student_id", "month__order", "month_id")
+        return serializer.to_rows(await _alist(serializer.values(quizzes)))
+
+
+class AsyncStudentSearchView(View):
+    async def get(self, request, value, *args, **kwargs):
+        queryset = search_students(
+            Student.objects.select_related("grade"), value, limit=parse_limit(request.GET.get("limit")),
+        )
+        return _json(StudentSerializer(await _alist(queryset), many=True).data)
@@ -0,0 +1,75 @@
+"""
+Database connection profiles, picked with ``DB_CONNECTION_PROFILE``.
+
+persistent (default)
+    One connection per worker, kept for ``DB_CONN_MAX_AGE`` seconds (600). Good
+    for a long-running server; every new connection still pays a TLS handshake.
+serverless
+    A fresh connection per request, closed when the request ends. Use it on the
+    Vercel lambda runtime, where a persistent connection stays open (and counted
+    against the server's limit) while the instance is frozen.
+pool
+    A psycopg 3 connection pool per worker (needs ``psycopg[pool]``): connections
+    are opened once, health-checked when handed out and reused across requests.
+    Sized by ``DB_POOL_MIN_SIZE`` / ``DB_POOL_MAX_SIZE``; a request waits up to
+    ``DB_POOL_TIMEOUT`` seconds for a free connection.
+pgbouncer
+    Safe behind PgBouncer in transaction mode: no server-side cursors and no
+    prepared statements, since consecutive transactions can land on different
+    server connections. Give the database a UTC default timezone
+    (``ALTER DATABASE ... SET timezone TO 'UTC'``) so Django never needs a
+    session-level ``SET TIME ZONE``.
+
+``DB_SSL_REQUIRE=false`` turns off the TLS requirement (local databases,
+PgBouncer on the same host).
+"""
+import importlib.util
+import os
+
+import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
+
+PROFILES = ("persistent", "serverless", "pool", "pgbouncer")
+
+
+def _flag(env, name, default):
+    return env.get(name, default).lower() == "true"
+
+
+def database_settings(default_url=None, profile=None, env=None):
+    """The ``DATABASES['default']`` dict for ``profile`` (default: ``$DB_CONNECTION_PROFILE``)."""
+    env = os.environ if env is None else env
+    profile = profile or env.get("DB_CONNECTION_PROFILE", "persistent")
+    if profile not in PROFILES:
+        raise ImproperlyConfigured(f"DB_CONNECTION_PROFILE must be one of {', '.join(PROFILES)}, not {profile!r}")
+
+    url = env.get("DATABASE_URL") or default_url
+    if not url:
+        return {}
+    keep_alive = int(env.get("DB_CONN_MAX_AGE", "600"))
+    config = dj_database_url.parse(
+        url,
+        conn_max_age=keep_alive if profile in ("persistent", "pgbouncer") else 0,
+        # Django hands pooled connections a check_connection() health check when this is on
+        conn_health_checks=profile in ("pool", "pgbouncer") or _flag(env, "DB_CONN_HEALTH_CHECKS", "false"),
+        ssl_require=_flag(env, "DB_SSL_REQUIRE", "true"),
+    )
+    options = config.setdefault("OPTIONS", {})
+
+    if profile == "pool":
+        if importlib.util.find_spec("psycopg_pool") is None:
+            raise ImproperlyConfigured("DB_CONNECTION_PROFILE=pool needs psycopg 3 with its pool: pip install 'psycopg[binary,pool]'")
+        options["pool"] = {
+            "min_size": int(env.get("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(env.get("DB_POOL_MAX_SIZE", "10")),
+            "timeout": float(env.get("DB_POOL_TIMEOUT", "10")),
+            "max_idle": float(env.get("DB_POOL_MAX_IDLE", "300")),
+        }
+
+    if profile == "pgbouncer":
+        config["DISABLE_SERVER_SIDE_CURSORS"] = True
+        if importlib.util.find_spec("psycopg") is not None:
+            # psycopg 3 prepares repeated queries server-side; psycopg2 never does
+            options["prepare_threshold"] = None
+
+    return config
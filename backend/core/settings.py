@@ -1,12 +1,15 @@
 from pathlib import Path
-from dotenv import load_dotenv
 import os
-import dj_database_url
+from core.db_profiles import database_settings
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-load_dotenv(BASE_DIR / ".env")
+# deployments set real environment variables and ship no .env, so skip importing dotenv there
+if (BASE_DIR / ".env").exists():
+    from dotenv import load_dotenv
+
+    load_dotenv(BASE_DIR / ".env")
 
 SECRET_KEY = os.getenv("SECRET_KEY", 'default-secret-key')
 DEBUG = False
@@ -27,6 +30,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.instrumentation.QueryInstrumentationMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.security.SecurityMiddleware',
@@ -37,6 +41,27 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# API_ONLY=true keeps only what the JSON endpoints need: no admin, sessions,
+# messages or static files, no CSRF/clickjacking middleware and no browsable
+# API. Less to import and initialise on every cold start of a serverless
+# function; nothing in api/ depends on the parts that are left out.
+API_ONLY = os.getenv('API_ONLY', 'false').lower() == 'true'
+if API_ONLY:
+    INSTALLED_APPS = [
+        app for app in INSTALLED_APPS
+        if app not in ('django.contrib.admin', 'django.contrib.sessions', 'django.contrib.messages', 'django.contrib.staticfiles')
+    ]
+    MIDDLEWARE = [
+        middleware for middleware in MIDDLEWARE
+        if middleware not in (
+            'django.contrib.sessions.middleware.SessionMiddleware',
+            'django.middleware.csrf.CsrfViewMiddleware',
+            'django.contrib.auth.middleware.AuthenticationMiddleware',
+            'django.contrib.messages.middleware.MessageMiddleware',
+            'django.middleware.clickjacking.XFrameOptionsMiddleware',
+        )
+    ]
+
 ROOT_URLCONF = 'core.urls'
 
 TEMPLATES = [
@@ -67,12 +92,10 @@ WSGI_APPLICATION = 'core.wsgi.application'
 #     }
 # }
 
+# Connection handling is chosen with DB_CONNECTION_PROFILE
+# (persistent | serverless | pool | pgbouncer), see core/db_profiles.py
 DATABASES = {
-    'default': dj_database_url.config(
-        default=os.getenv("POSTGRES_URL"),
-        conn_max_age=600,
-        ssl_require=True
-    )
+    'default': database_settings(os.getenv("POSTGRES_URL"))
 }
 
 # DATABASES = {
@@ -86,6 +109,36 @@ DATABASES = {
 # DATABASES['default'] = dj_database_url.config()
 
 
+# Cache used for grid responses (see api/cache.py). Saves invalidate a grid by
+# bumping its version in this cache, so every instance serving the API must share
+# it: with the per-process LocMemCache fallback, other workers (and every other
+# serverless instance on Vercel) keep serving their stale copy until it expires.
+# Grid caching is therefore only on when CACHE_BACKEND/CACHE_LOCATION name a
+# shared backend, e.g. django.core.cache.backends.db.DatabaseCache after
+# `manage.py createcachetable`; GRID_CACHE_ENABLED=true forces it on anyway.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', 'students-grid-cache'),
+    }
+}
+GRID_CACHE_ENABLED = os.getenv('GRID_CACHE_ENABLED', 'true' if os.getenv('CACHE_BACKEND') else 'false').lower() == 'true'
+GRID_CACHE_TIMEOUT = int(os.getenv('GRID_CACHE_TIMEOUT', '300'))
+
+# Delta sync (?since=): how far behind the read time the returned high-water mark
+# stays, so writes stamped with updated_at before they commit are not skipped
+DELTA_SYNC_OVERLAP_SECONDS = int(os.getenv('DELTA_SYNC_OVERLAP_SECONDS', '30'))
+
+
+# Request instrumentation (see api/instrumentation.py)
+SLOW_REQUEST_MS = int(os.getenv('SLOW_REQUEST_MS', '500'))
+REQUEST_STATS_ENABLED = os.getenv('REQUEST_STATS_ENABLED', 'false').lower() == 'true'
+
+# Background jobs (see api/jobs.py): when a silent running job is retried
+JOB_STALE_SECONDS = int(os.getenv('JOB_STALE_SECONDS', '300'))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -128,8 +181,17 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.DjangoModelPermissionsOrAnonReadOnly'
-    ]
+    ],
+    # orjson-backed, same output as rest_framework.renderers.JSONRenderer (see api/renderers.py)
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
+if API_ONLY:
+    # session auth needs the sessions app; the browsable API needs templates and static files
+    REST_FRAMEWORK['DEFAULT_AUTHENTICATION_CLASSES'] = ['rest_framework.authentication.BasicAuthentication']
+    REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = ['api.renderers.FastJSONRenderer']
 
 # CORS settings
 # CORS_ALLOW_ALL_ORIGINS = True